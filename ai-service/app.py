@@ -1,14 +1,27 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 import os
+import json
+import time
+import asyncio
 from dotenv import load_dotenv
 
-from services.document_processor import DocumentProcessor  # ⭐ New
+from services.document_processor import DocumentProcessor, InvalidPageRange, validate_page_ranges  # ⭐ New
+from services.extraction_cache import ExtractionCache, EXTRACTION_CACHE_MAX_MB
+from services.transcript_cache import TranscriptCache, TRANSCRIPT_CACHE_MAX_MB
 from services.content_generator import ContentGenerator
-from services.tts_generator import TTSService
+from services.tts_generator import TTSService, get_audio_profile
 from services.youtube_service import YouTubeService
+from services.whisper_model import whisper_model, WHISPER_PRELOAD, WHISPER_WARMUP
+from services.whisper_pool import WhisperPool
+from services.transcription_jobs import TranscriptionJobs
+from services.revision_service import RevisionService, InvalidDocumentId
+from services.upload_receiver import UploadReceiver, UploadTooLarge
+from services.extraction_sandbox import ExtractionFailed
+from services.executors import Executors, LoopLagMonitor
 
 load_dotenv()
 
@@ -22,11 +35,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Blocking work is routed through these so the event loop stays free
+executors = Executors()
+loop_lag_monitor = LoopLagMonitor()
+
 # Initialize services
-document_processor = DocumentProcessor()  # ⭐ New universal processor
+extraction_cache = ExtractionCache() if EXTRACTION_CACHE_MAX_MB > 0 else None  # 0 disables
+document_processor = DocumentProcessor(cache=extraction_cache)  # ⭐ New universal processor
 content_generator = ContentGenerator()
 tts_service = TTSService()
-youtube_service = YouTubeService()
+transcript_cache = TranscriptCache() if TRANSCRIPT_CACHE_MAX_MB > 0 else None  # 0 disables
+whisper_pool = WhisperPool(whisper_model=whisper_model)
+youtube_service = YouTubeService(whisper_model, transcript_cache, executors=executors,
+                                 whisper_pool=whisper_pool)
+transcription_jobs = TranscriptionJobs(youtube_service)
+revision_service = RevisionService(content_generator, executors=executors)
+upload_receiver = UploadReceiver()
+
+# Load Whisper before a forking server (gunicorn --preload) forks its
+# workers, so they share one copy of the weights
+if WHISPER_PRELOAD:
+    whisper_model.get()
 
 print("✅ StudyAI Service initialized")
 
@@ -37,6 +66,16 @@ print("✅ StudyAI Service initialized")
 
 class ExtractTextRequest(BaseModel):
     file_path: str
+    pages: Optional[str] = None  # e.g. "1-5,8": PDF pages, slides or sheets
+
+
+class DocumentInfoRequest(BaseModel):
+    file_path: str
+
+
+class BatchExtractRequest(BaseModel):
+    file_paths: List[str]
+    max_concurrency: Optional[int] = None
 
 
 class YouTubeRequest(BaseModel):
@@ -61,6 +100,15 @@ class GenerateFlashcardsRequest(BaseModel):
     num_cards:  int = 15
 
 
+class ProcessRevisionRequest(BaseModel):
+    document_id: str
+    text_content: str
+    filename: str
+    num_questions: int = 10
+    num_cards: int = 15
+    base_document_id: Optional[str] = None  # Previous version, if stored under another id
+
+
 class ChatRequest(BaseModel):
     document_id: str
     document_content: str
@@ -78,11 +126,106 @@ class GeneratePodcastRequest(BaseModel):
 # ENDPOINTS
 # ============================================
 
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    loop_lag_monitor.start()
+
+
+async def warm_up_whisper():
+    try:
+        await executors.run_io(whisper_pool.warm_up)
+    except Exception as e:
+        print(f"❌ Whisper warm-up failed: {e}")
+
+
+@app.on_event("startup")
+async def start_whisper_warmup():
+    # In the background: the server accepts requests meanwhile, and /ready
+    # reports 503 until it finishes
+    if WHISPER_WARMUP:
+        asyncio.get_running_loop().create_task(warm_up_whisper())
+
+
+@app.on_event("shutdown")
+async def shutdown_executors():
+    await loop_lag_monitor.stop()
+    transcription_jobs.shutdown()
+    whisper_pool.shutdown()
+    await youtube_service.close()
+    executors.shutdown()
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "service": "StudyAI"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Ready once the Whisper model is loaded (and the workers warmed up)
+    if it was configured to be at startup; otherwise it loads on first use"""
+    whisper_status = whisper_pool.status()
+    ready = ((not WHISPER_PRELOAD or whisper_status["loaded"])
+             and (not WHISPER_WARMUP or whisper_status["warmed_up"]))
+    content = {"ready": ready, "whisper": whisper_status}
+    if not ready:
+        raise HTTPException(status_code=503, detail=content)
+    return content
+
+
+@app.get("/metrics/event-loop")
+async def get_event_loop_metrics():
+    """Event loop lag (how late a periodic timer fires) and pool sizes"""
+    return {
+        "success": True,
+        "lag": loop_lag_monitor.stats(),
+        "io_workers": executors.io_workers,
+        "cpu_workers": executors.cpu_workers
+    }
+
+
+@app.get("/extraction-cache/stats")
+async def get_extraction_cache_stats():
+    """Hit rate and size of the extraction cache"""
+    if not extraction_cache:
+        return {"success": True, "enabled": False}
+    return {"success": True, "enabled": True, **extraction_cache.stats()}
+
+
+@app.get("/transcript-cache/stats")
+async def get_transcript_cache_stats():
+    """Hit rate, size and expirations of the YouTube transcript cache"""
+    if not transcript_cache:
+        return {"success": True, "enabled": False}
+    return {"success": True, "enabled": True, **transcript_cache.stats()}
+
+
+@app.get("/extraction-sandbox/stats")
+async def get_extraction_sandbox_stats():
+    """Completed/failed jobs and worker kills of the extraction sandbox"""
+    return {"success": True, **document_processor.sandbox.get_stats()}
+
+
+async def check_page_ranges(file_path: str, pages):
+    """Raise InvalidPageRange for a page spec that is malformed or selects
+    nothing in this document, before any extraction is queued"""
+    validate_page_ranges(pages)
+    if pages is None:
+        return
+    try:
+        info = await executors.run_io(document_processor.probe, file_path)
+    except Exception:
+        return  # Unreadable: the sandboxed extraction reports why
+    if info.get("pages"):
+        validate_page_ranges(pages, info["pages"])
+
+
+def extraction_error(e: ExtractionFailed) -> HTTPException:
+    """HTTP error carrying the structured failure reason"""
+    status_code = 504 if e.reason == "timeout" else 500
+    return HTTPException(status_code=status_code, detail=e.to_dict())
+
+
 @app.get("/supported-formats")
 async def get_supported_formats():
     """Get list of supported file formats"""
@@ -96,14 +239,22 @@ async def get_supported_formats():
 async def extract_text(request: ExtractTextRequest):
     """Extract text from ANY supported document format"""
     try:
+        await check_page_ranges(request.file_path, request.pages)
         print(f"📄 Extracting text from: {request.file_path}")
-        text = document_processor.extract_text(request.file_path)
+        text, _ = await executors.wait(
+            document_processor.submit_extraction(request.file_path, pages=request.pages)
+        )
         print(f"✅ Extracted {len(text)} characters")
         return {
             "success": True,
             "text": text,
             "length": len(text)
         }
+    except InvalidPageRange as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExtractionFailed as e:
+        print(f"❌ Text extraction failed ({e.reason}): {e.detail}")
+        raise extraction_error(e)
     except Exception as e:  
         print(f"❌ Text extraction error: {e}")
         import traceback
@@ -111,12 +262,154 @@ async def extract_text(request: ExtractTextRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/document-info")
+async def document_info(request: DocumentInfoRequest):
+    """Page count, outline and sizes of a document, without extracting text"""
+    try:
+        info = await executors.run_io(document_processor.probe, request.file_path)
+        return {"success": True, **info}
+    except Exception as e:
+        print(f"❌ Document info error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/extract-text/upload")
+async def extract_text_upload(request: Request):
+    """Extract text from a multipart upload (form field "file", optional
+    "pages" field), for callers that don't share a filesystem with this service"""
+    upload = None
+    try:
+        upload = await upload_receiver.receive(request)
+        print(f"📤 Received {upload['filename']} ({upload['size']} bytes)")
+        await check_page_ranges(upload["path"], upload["fields"].get("pages"))
+        
+        text, _ = await executors.wait(document_processor.submit_extraction(
+            upload["path"], digest=upload["sha256"], pages=upload["fields"].get("pages")
+        ))
+        print(f"✅ Extracted {len(text)} characters")
+        return {
+            "success": True,
+            "filename": upload["filename"],
+            "sha256": upload["sha256"],
+            "size": upload["size"],
+            "text": text,
+            "length": len(text)
+        }
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidPageRange as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExtractionFailed as e:
+        print(f"❌ Upload extraction failed ({e.reason}): {e.detail}")
+        raise extraction_error(e)
+    except Exception as e:
+        print(f"❌ Upload extraction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if upload:
+            os.remove(upload["path"])
+
+
+@app.post("/extract-text/stream")
+async def extract_text_stream(request: ExtractTextRequest):
+    """Stream extracted text as NDJSON, one line per page as it is parsed"""
+    if not os.path.exists(request.file_path):
+        raise HTTPException(status_code=500, detail=f"File not found: {request.file_path}")
+    try:
+        await check_page_ranges(request.file_path, request.pages)
+    except InvalidPageRange as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    print(f"📄 Streaming text from: {request.file_path}")
+    
+    # Sync generator: Starlette iterates it in a worker thread, so parsing
+    # never blocks the event loop and only one page is held at a time
+    def stream():
+        pages = 0
+        length = 0
+        try:
+            for page in document_processor.iter_extract(request.file_path, request.pages):
+                pages += 1
+                length += len(page["text"])
+                yield json.dumps({"type": "page", **page}) + "\n"
+            
+            if pages == 0:
+                raise Exception("No text found in document")
+            
+            print(f"✅ Streamed {pages} pages, {length} characters")
+            yield json.dumps({"type": "done", "pages": pages, "length": length}) + "\n"
+        except Exception as e:
+            print(f"❌ Streaming extraction error: {e}")
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/extract-text/batch")
+async def extract_text_batch(request: Request):
+    """Extract many documents in parallel, streaming one NDJSON line per
+    file as each finishes, then a "done" summary.
+
+    Accepts JSON {"file_paths": [...], "max_concurrency": n} or a
+    multipart upload with the documents in the "files" field (and an
+    optional "max_concurrency" field).
+    """
+    uploads = []
+    try:
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            upload = await upload_receiver.receive_files(request)
+            uploads = upload["files"]
+            files = [(f["path"], f["sha256"]) for f in uploads]
+            names = [f["filename"] for f in uploads]
+            max_concurrency = upload["fields"].get("max_concurrency")
+            max_concurrency = int(max_concurrency) if max_concurrency else None
+        else:
+            batch = BatchExtractRequest(**await request.json())
+            files = names = batch.file_paths
+            max_concurrency = batch.max_concurrency
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        upload_receiver.discard(uploads)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    print(f"📚 Batch extracting {len(files)} documents")
+    
+    def stream():
+        start = time.perf_counter()
+        succeeded = failed = 0
+        try:
+            for result in document_processor.iter_extract_batch(files, max_concurrency):
+                # Uploads are reported by their original name, not the temp path
+                result["file_path"] = names[result["index"]]
+                if result["success"]:
+                    succeeded += 1
+                else:
+                    failed += 1
+                    print(f"❌ {result['file_path']}: {result['error']}")
+                yield json.dumps({"type": "file", **result}) + "\n"
+            
+            seconds = round(time.perf_counter() - start, 3)
+            print(f"✅ Batch done: {succeeded} extracted, {failed} failed in {seconds}s")
+            yield json.dumps({"type": "done", "files": len(files), "succeeded": succeeded,
+                              "failed": failed, "seconds": seconds}) + "\n"
+        except Exception as e:
+            print(f"❌ Batch extraction error: {e}")
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            upload_receiver.discard(uploads)
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @app.post("/extract-youtube")
 async def extract_youtube(request: YouTubeRequest):
     """Extract transcript & details from YouTube video"""
     try: 
         print(f"📹 Extracting transcript from: {request.url}")
-        video_info = youtube_service.get_video_info(request.url)
+        # Details and transcript are fetched concurrently; yt-dlp, Whisper
+        # and the captions lookup run on the I/O pool
+        video_info = await youtube_service.get_video_info_async(request.url)
         return {
             "success": True,
             "video_id": video_info["video_id"],
@@ -131,6 +424,43 @@ async def extract_youtube(request: YouTubeRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/transcription-jobs", status_code=202)
+async def submit_transcription_job(request: YouTubeRequest):
+    """Start transcribing a YouTube video in the background; poll
+    /transcription-jobs/{job_id} or follow its /events for the result"""
+    print(f"📹 Queued transcription of: {request.url}")
+    job = transcription_jobs.submit(request.url)
+    return {"success": True, "job_id": job["job_id"], "status": job["status"]}
+
+
+@app.get("/transcription-jobs/{job_id}")
+async def get_transcription_job(job_id: str):
+    """Status and progress of a transcription job, with the result once done"""
+    job = transcription_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown transcription job: {job_id}")
+    return {"success": True, **job}
+
+
+@app.get("/transcription-jobs/{job_id}/events")
+async def follow_transcription_job(job_id: str):
+    """Server-sent events: a "progress" event each time the job changes,
+    then a final "done" or "failed" event"""
+    if transcription_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown transcription job: {job_id}")
+    
+    async def events():
+        async for job in transcription_jobs.watch(job_id):
+            if job is None:
+                yield ": keep-alive\n\n"
+                continue
+            event = job["status"] if job["status"] in ("done", "failed") else "progress"
+            yield f"event: {event}\ndata: {json.dumps(job)}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
 @app.post("/generate-notes")
 async def generate_notes(request: GenerateNotesRequest):
     """Generate comprehensive notes from document"""
@@ -200,6 +530,31 @@ async def generate_flashcards(request: GenerateFlashcardsRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/process-revision")
+async def process_revision(request: ProcessRevisionRequest):
+    """Regenerate notes, quiz and flashcards only for sections changed since the stored revision"""
+    try:
+        result = await revision_service.process_revision(
+            request.document_id,
+            request.text_content,
+            request.filename,
+            request.num_questions,
+            request.num_cards,
+            request.base_document_id
+        )
+        
+        return {
+            "success": True,
+            "document_id": request.document_id,
+            **result
+        }
+    except InvalidDocumentId as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Revision processing error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/chat")
 async def chat_with_document(request: ChatRequest):
     """Chat about the document - answers only from document content"""
@@ -225,6 +580,9 @@ class GeneratePodcastRequest(BaseModel):
     document_id: str
     text_content: str
     duration_minutes: Optional[int] = None  # ⭐ Now optional - AI decides if not provided
+    # Checked here (422) so a bad value doesn't cost a script generation first
+    audio_profile: Literal["mp3", "mp3_mono", "opus"] = "mp3"
+    bitrate_kbps: Optional[int] = Field(None, gt=0)  # Overrides the profile's default bitrate
 
 
 @app.post("/generate-podcast")
@@ -245,13 +603,17 @@ async def generate_podcast(request: GeneratePodcastRequest):
         # Convert to audio
         audio_path = await tts_service.generate_podcast_audio(
             script,
-            request.document_id
+            request.document_id,
+            request.audio_profile,
+            request.bitrate_kbps
         )
         
         return {
             "success": True,
             "document_id": request.document_id,
             "audio_path":  audio_path,
+            "audio_profile": request.audio_profile,
+            "mime_type": get_audio_profile(request.audio_profile)["mime_type"],
             "script": script
         }
     except Exception as e:
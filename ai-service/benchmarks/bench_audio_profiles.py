@@ -0,0 +1,61 @@
+"""
+Benchmark podcast audio output profiles: file size vs encode time.
+
+Usage (from ai-service/):
+    python benchmarks/bench_audio_profiles.py [path/to/sample.mp3]
+
+Defaults to the first podcast in outputs/podcasts. Needs pydub + ffmpeg.
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.tts_generator import AUDIO_PROFILES, encode_audio  # noqa: E402
+
+# Bitrates to sweep for each re-encoded profile (None = profile default)
+BITRATES = {
+    "mp3": [None],
+    "mp3_mono": [32, 48, 64],
+    "opus": [16, 24, 32],
+}
+
+
+def main():
+    if len(sys.argv) > 1:
+        sample = Path(sys.argv[1])
+    else:
+        podcasts = sorted((Path(__file__).resolve().parent.parent / "outputs" / "podcasts").glob("*.mp3"))
+        if not podcasts:
+            print("❌ No sample audio found - pass a file path")
+            sys.exit(1)
+        sample = podcasts[0]
+
+    from pydub import AudioSegment
+
+    seconds = len(AudioSegment.from_file(sample)) / 1000
+    source_size = sample.stat().st_size
+    print(f"🎧 Sample: {sample.name} ({seconds:.1f}s, {source_size / 1024:.0f} KB)")
+    print(f"{'profile':<10} {'kbps':>5} {'size KB':>9} {'vs src':>7} {'encode s':>9} {'x realtime':>11}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, profile in AUDIO_PROFILES.items():
+            # Every profile decodes the same sample so timings are comparable
+            source = dict(profile, source_format="mp3", passthrough=False)
+            for kbps in BITRATES.get(name, [None]):
+                out = Path(tmp) / f"{name}_{kbps}.{profile['extension']}"
+                start = time.perf_counter()
+                encode_audio([str(sample)], str(out), source, kbps)
+                elapsed = time.perf_counter() - start
+                size = out.stat().st_size
+                print(
+                    f"{name:<10} {str(kbps or profile['bitrate_kbps'] or '-'):>5} "
+                    f"{size / 1024:>9.0f} {size / source_size:>6.0%} "
+                    f"{elapsed:>9.2f} {seconds / elapsed:>10.0f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
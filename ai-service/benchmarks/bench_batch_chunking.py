@@ -0,0 +1,54 @@
+"""
+Benchmark batch chunking throughput across 1..N worker processes.
+
+Usage (from ai-service/):
+    python benchmarks/bench_batch_chunking.py [documents] [mb_per_document] [max_workers]
+
+Defaults to 16 documents of 4 MB and up to os.cpu_count() workers.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_chunking import make_corpus  # noqa: E402
+from services.chunking import TextChunker  # noqa: E402
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    mb_each = float(sys.argv[2]) if len(sys.argv) > 2 else 4
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    documents = [
+        (f"doc-{i}", make_corpus(int(mb_each * 1024 * 1024), "structured", seed=i))
+        for i in range(count)
+    ]
+    total_mb = sum(len(text) for _, text in documents) / (1024 * 1024)
+    chunker = TextChunker()
+
+    print(f"📚 {count} documents, {total_mb:.0f} MB total, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'seconds':>8} {'MB/s':>7} {'docs/s':>7} {'speedup':>8}")
+
+    steps = sorted({1, max_workers} | {2 ** i for i in range(max_workers.bit_length()) if 2 ** i <= max_workers})
+
+    baseline = None
+    for workers in steps:
+        # Pool start-up is excluded: a service keeps its pool warm
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(abs, range(workers)))
+            start = time.perf_counter()
+            tables = chunker.chunk_table_batch(documents, workers, pool if workers > 1 else None)
+            elapsed = time.perf_counter() - start
+
+        assert [t.document_id for t in tables] == [d for d, _ in documents]
+        baseline = baseline or elapsed
+        print(f"{workers:>7} {elapsed:>8.2f} {total_mb / elapsed:>7.1f} "
+              f"{count / elapsed:>7.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare memory of chunk() dicts with the compact ChunkTable.
+
+Usage (from ai-service/):
+    python benchmarks/bench_chunk_memory.py [pages] [chars_per_page]
+
+Defaults to a 500-page book at ~3000 characters per page.
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_chunking import make_corpus  # noqa: E402
+from services.chunking import TextChunker  # noqa: E402
+
+
+def measure(build):
+    """Return (result, bytes still allocated by it, seconds to build)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    chars_per_page = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    text = make_corpus(pages * chars_per_page, "structured")
+    chunker = TextChunker()
+
+    print(f"📚 {pages}-page book: {len(text) / 1024 / 1024:.2f} MB of text")
+
+    chunks, dict_bytes, dict_seconds = measure(lambda: chunker.chunk(text, "bench"))
+    count = len(chunks)
+    del chunks
+
+    table, table_bytes, table_seconds = measure(lambda: chunker.chunk_table(text, "bench"))
+    text_bytes = sys.getsizeof(table.text)
+
+    shares_input = table.text is text
+
+    # Retained = memory held on top of the caller's own copy of the text
+    print(f"{'representation':<16} {'chunks':>7} {'retained MB':>12} {'B/chunk':>8} {'build s':>8}")
+    print(f"{'chunk() dicts':<16} {count:>7} {dict_bytes / 1e6:>12.2f} "
+          f"{dict_bytes / count:>8.0f} {dict_seconds:>8.2f}")
+    print(f"{'ChunkTable':<16} {len(table):>7} {table_bytes / 1e6:>12.2f} "
+          f"{table_bytes / len(table):>8.0f} {table_seconds:>8.2f}")
+    print(f"ChunkTable text buffer: {text_bytes / 1e6:.2f} MB, "
+          f"{'shared with the input (already clean)' if shares_input else 'cleaned copy'}")
+
+    # Reading every chunk through the dict adapter, one at a time
+    _, adapter_bytes, adapter_seconds = measure(lambda: sum(len(c["text"]) for c in table.iter_dicts()))
+    print(f"iter_dicts() pass: {adapter_seconds:.2f}s, {adapter_bytes / 1e3:.0f} KB retained")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark TextChunker throughput on synthetic corpora of growing size.
+
+Usage (from ai-service/):
+    python benchmarks/bench_chunking.py [size_mb ...]
+
+Defaults to 1, 10 and 100 MB. Linear scaling shows up as a flat
+seconds-per-MB column across sizes.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.chunking import TextChunker  # noqa: E402
+
+WORDS = (
+    "the cell membrane controls transport of molecules energy is stored as ATP "
+    "in mitochondria Newton described motion with three laws enzymes lower the "
+    "activation energy of reactions photosynthesis converts light into sugar"
+).split()
+
+
+def make_corpus(size_bytes: int, layout: str, seed: int = 0) -> str:
+    """Build a book-like corpus: "structured" has headings and paragraphs,
+    "flat" has paragraphs only, "wall" is one huge paragraph of sentences"""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    chapter = 0
+    while total < size_bytes:
+        if layout == "structured" and rng.random() < 0.08:
+            chapter += 1
+            block = f"CHAPTER {chapter}\n\n{chapter}.1 Overview"
+        else:
+            sentences = []
+            for _ in range(rng.randint(2, 8)):
+                words = rng.choices(WORDS, k=rng.randint(6, 24))
+                sentences.append(" ".join(words).capitalize() + rng.choice(".!?"))
+            block = " ".join(sentences)
+        parts.append(block)
+        total += len(block) + 2
+    separator = " " if layout == "wall" else "\n\n"
+    return separator.join(parts)
+
+
+def main():
+    sizes = [float(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    chunker = TextChunker()
+
+    print(f"{'layout':<11} {'MB':>6} {'chunks':>9} {'seconds':>9} {'s/MB':>7} {'MB/s':>7}")
+    for layout in ("structured", "flat", "wall"):
+        for size_mb in sizes:
+            text = make_corpus(int(size_mb * 1024 * 1024), layout)
+
+            start = time.perf_counter()
+            count = sum(1 for _ in chunker.iter_chunks(text, "bench"))
+            elapsed = time.perf_counter() - start
+
+            mb = len(text) / (1024 * 1024)
+            print(
+                f"{layout:<11} {mb:>6.1f} {count:>9} {elapsed:>9.2f} "
+                f"{elapsed / mb:>7.3f} {mb / elapsed:>7.1f}"
+            )
+            del text
+
+
+if __name__ == "__main__":
+    main()
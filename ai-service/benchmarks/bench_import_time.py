@@ -0,0 +1,59 @@
+"""
+Benchmark import and startup cost of the document extraction stack.
+
+Usage (from ai-service/):
+    python benchmarks/bench_import_time.py [runs]
+
+Each measurement runs in a fresh interpreter (default 5 runs, best time
+reported): importing services.document_processor, importing every parser
+library up front (what the module used to do), and the first use of each
+parser backend once the module is loaded.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_IMPORTS = "import PyPDF2, docx, pptx, openpyxl, filetype"
+
+CASES = [
+    ("import services.document_processor", "import services.document_processor"),
+    ("eager parser imports (old module)", HEAVY_IMPORTS + "; import services.document_processor"),
+    ("first PDF backend use", "import services.document_processor", "import PyPDF2"),
+    ("first DOCX backend use", "import services.document_processor", "import docx"),
+    ("first PPTX backend use", "import services.document_processor", "import pptx"),
+    ("first XLSX backend use", "import services.document_processor", "import openpyxl"),
+    ("file type detection", "import services.document_processor", "import filetype"),
+]
+
+
+def time_in_subprocess(setup: str, statement: str) -> float:
+    """Seconds spent on statement in a fresh interpreter, after setup"""
+    script = (
+        "import time\n"
+        f"{setup}\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT,
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'case':<38} {'best ms':>8}")
+    for case in CASES:
+        name, statement = case[0], case[-1]
+        setup = case[1] if len(case) == 3 else "pass"
+        best = min(time_in_subprocess(setup, statement) for _ in range(runs))
+        print(f"{name:<38} {best * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
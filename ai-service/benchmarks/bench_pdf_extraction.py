@@ -0,0 +1,54 @@
+"""
+Benchmark sequential vs process-pool PDF text extraction.
+
+Usage (from ai-service/):
+    python benchmarks/bench_pdf_extraction.py path/to/book.pdf [max_workers]
+
+Runs DocumentProcessor.extract_from_pdf with 1, 2, 4 ... max_workers
+(default os.cpu_count()) and reports the speedup over one worker.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.document_processor import DocumentProcessor  # noqa: E402
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    pdf_path = sys.argv[1]
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    steps = sorted({1, max_workers} | {2 ** i for i in range(max_workers.bit_length()) if 2 ** i <= max_workers})
+
+    pages = DocumentProcessor().count_pdf_pages(pdf_path)
+    print(f"📕 {Path(pdf_path).name}: {pages} pages, {os.cpu_count()} CPUs")
+
+    results = []
+    for workers in steps:
+        # Threshold 1 forces the pool for every worker count above one
+        processor = DocumentProcessor(pdf_workers=workers, pdf_parallel_min_pages=1)
+        if workers > 1:
+            processor._extract_pdf_pages_parallel(pdf_path, list(range(1, min(pages, workers) + 1)))  # Warm the pool
+
+        start = time.perf_counter()
+        text = processor.extract_from_pdf(pdf_path)
+        elapsed = time.perf_counter() - start
+        results.append((workers, elapsed, len(text)))
+
+        if processor._pdf_pool:
+            processor._pdf_pool.shutdown()
+
+    baseline = results[0][1]
+    print(f"{'workers':>7} {'seconds':>8} {'pages/s':>8} {'speedup':>8} {'chars':>10}")
+    for workers, elapsed, chars in results:
+        print(f"{workers:>7} {elapsed:>8.2f} {pages / elapsed:>8.1f} {baseline / elapsed:>7.2f}x {chars:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark the adaptive PDF path against PyPDF2 alone and pdfplumber alone.
+
+Usage (from ai-service/):
+    python benchmarks/bench_pdf_quality.py path/to/file.pdf [threshold]
+
+Reports time, mean page quality score and the number of pages below the
+threshold (default PDF_QUALITY_THRESHOLD) for each path.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.document_processor import DocumentProcessor  # noqa: E402
+from services.pdf_processor import PDFProcessor, PDF_QUALITY_THRESHOLD, score_page_text  # noqa: E402
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    pdf_path = sys.argv[1]
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else PDF_QUALITY_THRESHOLD
+
+    def pypdf2_only():
+        processor = DocumentProcessor(pdf_workers=1, pdf_quality_threshold=0)
+        return [text for _, text in processor.iter_pdf_pages(pdf_path)]
+
+    def adaptive():
+        processor = DocumentProcessor(pdf_workers=1, pdf_quality_threshold=threshold)
+        return [text for _, text in processor.iter_pdf_pages(pdf_path)]
+
+    def pdfplumber_only():
+        processor = PDFProcessor()
+        with processor.open(pdf_path) as pdf:
+            return [processor.extract_page(pdf, n) for n in range(1, len(pdf.pages) + 1)]
+
+    print(f"📕 {Path(pdf_path).name}, threshold {threshold}")
+    print(f"{'path':<12} {'seconds':>8} {'mean score':>10} {'low pages':>10}")
+    for name, run in [("PyPDF2", pypdf2_only), ("adaptive", adaptive), ("pdfplumber", pdfplumber_only)]:
+        start = time.perf_counter()
+        pages = run()
+        elapsed = time.perf_counter() - start
+
+        scores = [score_page_text(text) for text in pages]
+        low = sum(1 for score in scores if score < threshold)
+        print(f"{name:<12} {elapsed:>8.2f} {sum(scores) / len(scores):>10.3f} {low:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark segmented parallel Whisper transcription against one piece on one worker.
+
+Usage (from ai-service/):
+    python benchmarks/bench_whisper_segments.py path/to/audio.mp3 [workers]
+
+Both pools are warmed up first, so model loading isn't timed. Reports wall
+time, the number of audio segments and transcript segments, and the
+largest gap or overlap between stitched timestamps at the cuts. workers
+defaults to WHISPER_WORKERS (or 2 if that is 1); use WHISPER_MODEL to pick
+the model. Segmenting is enabled here whatever WHISPER_SEGMENTING says.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.whisper_pool import WhisperPool, WHISPER_WORKERS  # noqa: E402
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    audio_path = sys.argv[1]
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(2, WHISPER_WORKERS)
+
+    segmented = WhisperPool(workers=workers, segmenting=True)
+    plan = segmented.plan(audio_path)
+    print(f"🎧 {Path(audio_path).name}: {len(plan) or 1} segments on {workers} workers")
+    for start, end in plan:
+        print(f"   {start:8.1f}s - {end:8.1f}s")
+
+    timings = {}
+    print(f"{'path':<12} {'seconds':>8} {'segments':>9} {'characters':>11} {'max jump':>9}")
+    for name, pool in [("one piece", WhisperPool(workers=1)), ("segmented", segmented)]:
+        pool.warm_up()
+        start = time.perf_counter()
+        result = pool.transcribe(audio_path)
+        timings[name] = time.perf_counter() - start
+        pool.shutdown()
+
+        # Each segment should start about where the previous one ended
+        segments = result["segments"]
+        jump = max((abs(b["start"] - a["end"]) for a, b in zip(segments, segments[1:])), default=0)
+        print(f"{name:<12} {timings[name]:>8.2f} {len(segments):>9} {len(result['text']):>11} {jump:>8.2f}s")
+
+    print(f"⚡ Speedup: {timings['one piece'] / timings['segmented']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+from array import array
+from typing import Callable, Dict, Iterator, List, Optional
+import hashlib
+import sys
+import uuid
+
+
+# Title encodings stored in ChunkTable.title_starts (offsets are >= 0)
+TITLE_GENERATED = -1  # Derived from the chunk text when accessed
+TITLE_LITERAL = -2    # title_ends holds an index into literal_titles
+
+
+class ChunkView:
+    """Lightweight handle on one row of a ChunkTable; strings are only
+    built when an attribute is read"""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "ChunkTable", index: int):
+        self.table = table
+        self.index = index
+
+    @property
+    def id(self) -> str:
+        return self.table.chunk_id(self.index)
+
+    @property
+    def title(self) -> str:
+        return self.table.title(self.index)
+
+    @property
+    def text(self) -> str:
+        return self.table.chunk_text(self.index)
+
+    @property
+    def order(self) -> int:
+        return self.index
+
+    @property
+    def start(self) -> int:
+        return self.table.starts[self.index]
+
+    @property
+    def end(self) -> int:
+        return self.table.ends[self.index]
+
+    @property
+    def char_count(self) -> int:
+        return self.table.ends[self.index] - self.table.starts[self.index]
+
+    @property
+    def token_count(self) -> int:
+        return self.table.token_counts[self.index]
+
+    def to_dict(self) -> Dict:
+        return self.table.to_dict(self.index)
+
+    def __repr__(self) -> str:
+        return f"ChunkView(order={self.index}, start={self.start}, end={self.end})"
+
+
+class ChunkTable:
+    """Compact chunk storage: one shared copy of the cleaned document text
+    plus parallel arrays of offsets, so a chunk costs a few dozen bytes
+    instead of a dict holding its own copy of the text.
+
+    A row's order is its index. Titles are stored as offsets when they are
+    a slice of the text (headings), as an index into a small list of
+    literal titles ("Introduction", "Section 3"), or generated on access.
+    """
+
+    def __init__(self, text: str, document_id: str, track_overlap: bool = False,
+                 content_hashes: bool = False,
+                 generate_title: Optional[Callable[[str, int], str]] = None):
+        self.text = text
+        self.document_id = document_id
+        self.starts = array('q')
+        self.ends = array('q')
+        self.title_starts = array('q')
+        self.title_ends = array('q')
+        self.token_counts = array('q')
+        self.overlaps = array('q') if track_overlap else None
+        self.ids = bytearray()  # 16 raw bytes per chunk UUID
+        self.literal_titles: List[str] = []
+        self._literal_index: Dict[str, int] = {}
+        self.content_hashes = content_hashes
+        self._generate_title = generate_title
+
+    def append(self, start: int, end: int, title: Optional[str], id_bytes: bytes,
+               token_count: int, overlap: int = 0):
+        """Add a chunk covering text[start:end]"""
+        if title is None:
+            title_start, title_end = TITLE_GENERATED, 0
+        elif self.text.startswith(title, start):
+            title_start, title_end = start, start + len(title)
+        else:
+            index = self._literal_index.get(title)
+            if index is None:
+                index = self._literal_index[title] = len(self.literal_titles)
+                self.literal_titles.append(title)
+            title_start, title_end = TITLE_LITERAL, index
+
+        self.starts.append(start)
+        self.ends.append(end)
+        self.title_starts.append(title_start)
+        self.title_ends.append(title_end)
+        self.token_counts.append(token_count)
+        if self.overlaps is not None:
+            self.overlaps.append(overlap)
+        self.ids += id_bytes
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> ChunkView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        return ChunkView(self, index)
+
+    def __iter__(self) -> Iterator[ChunkView]:
+        for index in range(len(self)):
+            yield ChunkView(self, index)
+
+    def chunk_text(self, index: int) -> str:
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def chunk_id(self, index: int) -> str:
+        return str(uuid.UUID(bytes=bytes(self.ids[index * 16:index * 16 + 16])))
+
+    def title(self, index: int) -> str:
+        title_start = self.title_starts[index]
+        if title_start >= 0:
+            return self.text[title_start:self.title_ends[index]]
+        if title_start == TITLE_LITERAL:
+            return self.literal_titles[self.title_ends[index]]
+        return self._generate_title(self.chunk_text(index), index)
+
+    def to_dict(self, index: int) -> Dict:
+        """Materialize one row in the TextChunker.chunk() dict format"""
+        chunk_text = self.chunk_text(index)
+        chunk = {
+            "id": self.chunk_id(index),
+            "document_id": self.document_id,
+            "title": self.title(index),
+            "text": chunk_text,
+            "order": index,
+            "char_count": len(chunk_text),
+            "token_count": self.token_counts[index]
+        }
+        if self.overlaps is not None:
+            chunk["overlap_tokens"] = self.overlaps[index]
+        if self.content_hashes:
+            chunk["content_hash"] = hashlib.sha256(chunk_text.encode('utf-8')).hexdigest()
+        return chunk
+
+    def iter_dicts(self) -> Iterator[Dict]:
+        """Adapter for callers that expect chunk() dicts, built one at a time"""
+        for index in range(len(self)):
+            yield self.to_dict(index)
+
+    def to_dicts(self) -> List[Dict]:
+        return list(self.iter_dicts())
+
+    def nbytes(self, include_text: bool = True) -> int:
+        """Approximate memory held by the table's buffers"""
+        arrays = [self.starts, self.ends, self.title_starts, self.title_ends, self.token_counts]
+        if self.overlaps is not None:
+            arrays.append(self.overlaps)
+
+        size = sum(a.itemsize * len(a) for a in arrays) + len(self.ids)
+        size += sum(len(t) for t in self.literal_titles)
+        if include_text:
+            size += sys.getsizeof(self.text)
+        return size
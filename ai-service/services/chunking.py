@@ -1,135 +1,513 @@
-from typing import List, Dict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import hashlib
+import heapq
+import math
+import os
+import sys
 import uuid
 
+from services.chunk_table import ChunkTable
+from services.outline import DocumentOutline
+
+# (start, end) offsets into the cleaned document text
+Span = Tuple[int, int]
+
+# Namespace for content-derived chunk IDs (uuid5 of the chunk's SHA-256)
+CHUNK_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "studyai/chunk")
+
 
 class TextChunker:
-    def __init__(self, max_chunk_size: int = 2000, min_chunk_size: int = 300):
+    # "structure": heading/paragraph chunks of at most max_chunk_size chars
+    # "tokens": sentence-aligned windows of at most max_chunk_tokens, overlapping
+    # "cdc": content-defined boundaries between min_chunk_size and max_chunk_size
+    MODES = ("structure", "tokens", "cdc")
+
+    def __init__(self, max_chunk_size: int = 2000, min_chunk_size: int = 300,
+                 mode: str = "structure", max_chunk_tokens: int = 512,
+                 overlap_tokens: int = 64, chars_per_token: float = 4.0,
+                 token_counter: Optional[Callable[[str], int]] = None,
+                 avg_chunk_size: int = 1000, stable_ids: Optional[bool] = None):
+        if mode not in self.MODES:
+            raise Exception(f"Unsupported chunking mode: {mode}")
+        if mode == "tokens" and not 0 <= overlap_tokens < max_chunk_tokens:
+            raise Exception("overlap_tokens must be between 0 and max_chunk_tokens")
+
         self.max_chunk_size = max_chunk_size
         self.min_chunk_size = min_chunk_size
-    
+        self.mode = mode
+        self.max_chunk_tokens = max_chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        # Token counts are estimated from length unless a real tokenizer
+        # (e.g. tiktoken's encode wrapped in len) is supplied
+        self.chars_per_token = chars_per_token
+        self.token_counter = token_counter
+        self.avg_chunk_size = avg_chunk_size
+        # Content-derived IDs survive re-uploads and edits elsewhere in the
+        # document; on by default for cdc, where boundaries are stable too
+        self.stable_ids = (mode == "cdc") if stable_ids is None else stable_ids
+
     def chunk(self, text: str, document_id: str) -> List[Dict]:
         """Smart chunking based on content structure"""
-        
+
         print(f"Starting chunking for document: {document_id}")
         print(f"Input text length: {len(text)} characters")
-        
+
         if not text or len(text.strip()) == 0:
             print("Empty text received, returning empty chunks")
             return []
-        
+
+        chunks = list(self.iter_chunks(text, document_id))
+
+        print(f"Created {len(chunks)} total chunks")
+        return chunks
+
+    def iter_chunks(self, text: str, document_id: str) -> Iterator[Dict]:
+        """Yield chunks one at a time, in the same format as chunk().
+
+        The text is cleaned once; sections, paragraphs and sentences are then
+        tracked as offsets into it, so each chunk's text is sliced out exactly
+        once when it is yielded.
+        """
+        if not text or len(text.strip()) == 0:
+            return
+
         # Clean the text first
         text = self._clean_text(text)
-        
-        # Split into sections
-        sections = self._split_by_sections(text)
-        
-        print(f"Split into {len(sections)} sections")
-        
-        chunks = []
-        chunk_order = 0
-        
-        for section in sections:
-            section_text = section["text"].strip()
-            
-            if not section_text or len(section_text) < 50:
+
+        seen_hashes = {}
+        for chunk_order, (title, start, end, token_count, overlap) in enumerate(self._iter_chunk_records(text)):
+            chunk_text = text[start:end]
+            chunk = {
+                "id": self._chunk_id(chunk_text, seen_hashes),
+                "document_id": document_id,
+                "title": title or self._generate_title(chunk_text, chunk_order),
+                "text": chunk_text,
+                "order": chunk_order,
+                "char_count": len(chunk_text),
+                "token_count": token_count
+            }
+            if self.mode == "tokens":
+                # Tokens at the start of this chunk repeated from the previous one
+                chunk["overlap_tokens"] = overlap
+            if self.stable_ids:
+                chunk["content_hash"] = self._content_hash(chunk_text)
+            yield chunk
+
+    def chunk_table(self, text: str, document_id: str) -> ChunkTable:
+        """Chunk into a compact ChunkTable of offsets into one shared copy of
+        the cleaned text; use table.iter_dicts() for the chunk() format"""
+        text = self._clean_text(text) if text else ""
+        table = ChunkTable(text, document_id, self.mode == "tokens", self.stable_ids, self._generate_title)
+
+        seen_hashes = {}
+        for title, start, end, token_count, overlap in self._iter_chunk_records(text):
+            chunk_id = self._chunk_id(text[start:end], seen_hashes)
+            table.append(start, end, title, uuid.UUID(chunk_id).bytes, token_count, overlap)
+
+        return table
+
+    def chunk_batch(self, documents: Sequence[Tuple[str, str]],
+                    max_workers: Optional[int] = None,
+                    executor: Optional[Executor] = None) -> List[List[Dict]]:
+        """Chunk many (document_id, text) pairs across processes; results
+        are in input order, in the chunk() format"""
+        return [table.to_dicts() for table in self.chunk_table_batch(documents, max_workers, executor)]
+
+    def chunk_table_batch(self, documents: Sequence[Tuple[str, str]],
+                          max_workers: Optional[int] = None,
+                          executor: Optional[Executor] = None) -> List[ChunkTable]:
+        """Chunk many (document_id, text) pairs on a process pool.
+
+        Texts are handed to the workers through one shared memory block
+        instead of being pickled, and workers send back only the table's
+        offset arrays (plus the cleaned text when cleaning changed it).
+        token_counter, if set, must be picklable.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        if not documents:
+            return []
+        if executor is None and (max_workers == 1 or len(documents) == 1):
+            return [self.chunk_table(text, document_id) for document_id, text in documents]
+
+        encoded = [text.encode('utf-8') for _, text in documents]
+        block = shared_memory.SharedMemory(create=True, size=max(sum(len(e) for e in encoded), 1))
+
+        try:
+            jobs = []
+            offset = 0
+            for (document_id, _), data in zip(documents, encoded):
+                block.buf[offset:offset + len(data)] = data
+                jobs.append((self, block.name, offset, len(data), document_id))
+                offset += len(data)
+            del encoded
+
+            own_executor = executor is None
+            if own_executor:
+                executor = ProcessPoolExecutor(max_workers=min(max_workers, len(documents)))
+            try:
+                tables = list(executor.map(_chunk_shared_document, jobs))
+            finally:
+                if own_executor:
+                    executor.shutdown()
+        finally:
+            block.close()
+            block.unlink()
+
+        for table, (_, text) in zip(tables, documents):
+            # The worker dropped the text when it was already clean
+            if table.text is None:
+                table.text = text
+            table._generate_title = self._generate_title
+
+        return tables
+
+    def build_outline(self, table: ChunkTable) -> DocumentOutline:
+        """Heading hierarchy of a chunked document, with each section mapped
+        to the range of table rows it covers"""
+        text = table.text
+        headings = (
+            (self._heading_level(text[start:end]), text[start:min(end, start + 60)], start)
+            for start, end in self._iter_heading_lines(text)
+        )
+        return DocumentOutline.build(headings, len(text), table.starts, table.ends)
+
+    def chunk_with_outline(self, text: str, document_id: str) -> Tuple[List[Dict], DocumentOutline]:
+        """chunk() plus the document outline (chunk ranges index the list)"""
+        table = self.chunk_table(text, document_id)
+        return table.to_dicts(), self.build_outline(table)
+
+    def _iter_chunk_records(self, text: str) -> Iterator[Tuple[Optional[str], int, int, int, int]]:
+        """Yield (title, start, end, token_count, overlap_tokens) for the
+        configured mode over cleaned text"""
+        if self.mode == "tokens":
+            spans = self._iter_token_window_spans(text)
+        elif self.mode == "cdc":
+            spans = (
+                (title, start, end, self._count_tokens(text, start, end), 0)
+                for title, start, end in self._iter_cdc_spans(text)
+            )
+        else:
+            spans = (
+                (title, start, end, self._count_tokens(text, start, end), 0)
+                for title, start, end in self._iter_chunk_spans(text)
+            )
+
+        produced = False
+        for record in spans:
+            produced = True
+            yield record
+
+        # If no chunks created, create one from entire text
+        if not produced and text:
+            print("No chunks created from sections, creating single chunk")
+            end = min(len(text), self.max_chunk_size)
+            yield "Main Content", 0, end, self._count_tokens(text, 0, end), 0
+
+    def _iter_chunk_spans(self, text: str) -> Iterator[Tuple[Optional[str], int, int]]:
+        """Yield (title, start, end) for every chunk; title is None when it
+        should be generated from the chunk text"""
+        for title, start, end in self._iter_section_spans(text):
+            if end - start < 50:
                 continue
-            
+
             # If section is too large, split further
-            if len(section_text) > self.max_chunk_size:
-                sub_chunks = self._split_large_text(section_text)
-                for sub_chunk in sub_chunks:
-                    sub_chunk = sub_chunk.strip()
-                    if len(sub_chunk) >= 50:
-                        chunks.append({
-                            "id": str(uuid.uuid4()),
-                            "document_id": document_id,
-                            "title": self._generate_title(sub_chunk, chunk_order),
-                            "text": sub_chunk,
-                            "order": chunk_order,
-                            "char_count": len(sub_chunk)
-                        })
-                        chunk_order += 1
+            if end - start > self.max_chunk_size:
+                for sub_start, sub_end in self._iter_large_text_spans(text, start, end):
+                    if sub_end - sub_start >= 50:
+                        yield None, sub_start, sub_end
             else:
-                chunks.append({
-                    "id": str(uuid.uuid4()),
-                    "document_id": document_id,
-                    "title": section.get("title", self._generate_title(section_text, chunk_order)),
-                    "text": section_text,
-                    "order": chunk_order,
-                    "char_count": len(section_text)
-                })
-                chunk_order += 1
-        
-        # If no chunks created, create one from entire text
-        if not chunks and text.strip():
-            print("No chunks created from sections, creating single chunk")
-            chunks.append({
-                "id": str(uuid.uuid4()),
-                "document_id": document_id,
-                "title": "Main Content",
-                "text": text.strip()[:self.max_chunk_size],
-                "order": 0,
-                "char_count": min(len(text), self.max_chunk_size)
-            })
-        
-        print(f"Created {len(chunks)} total chunks")
-        return chunks
-    
+                yield title, start, end
+
+    def _chunk_id(self, chunk_text: str, seen_hashes: Dict[str, int]) -> str:
+        """Random uuid4, or a uuid5 of the chunk content when stable_ids is
+        set (repeats of the same text within a document get a counter)"""
+        if not self.stable_ids:
+            return str(uuid.uuid4())
+
+        digest = self._content_hash(chunk_text)
+        repeat = seen_hashes.get(digest, 0)
+        seen_hashes[digest] = repeat + 1
+        return str(uuid.uuid5(CHUNK_ID_NAMESPACE, digest if repeat == 0 else f"{digest}:{repeat}"))
+
+    @staticmethod
+    def _content_hash(chunk_text: str) -> str:
+        """SHA-256 hex digest of a chunk's text"""
+        return hashlib.sha256(chunk_text.encode('utf-8')).hexdigest()
+
+    def _iter_cdc_spans(self, text: str) -> Iterator[Tuple[Optional[str], int, int]]:
+        """Yield (title, start, end) for content-defined chunks.
+
+        Boundaries depend only on nearby content, so an edit moves at most
+        the chunks around it and the rest keep their text (and IDs).
+        Headings are always boundaries.
+        """
+        for title, start, end in self._iter_heading_spans(text):
+            if end - start < 50:
+                continue
+
+            spans = list(self._iter_section_cdc_spans(text, start, end))
+            for span_start, span_end in spans:
+                if span_end - span_start >= 50:
+                    yield (title if len(spans) == 1 else None), span_start, span_end
+
+    def _iter_section_cdc_spans(self, text: str, start: int, end: int) -> Iterator[Span]:
+        """FastCDC-style cutting of one section, with sentences as the
+        rolling unit: a cut may follow any sentence once the chunk reaches
+        min_chunk_size and is forced before max_chunk_size is exceeded"""
+        chunk_start = chunk_end = -1
+
+        for unit_start, unit_end in self._iter_cdc_units(text, start, end):
+            if chunk_start != -1 and unit_end - chunk_start > self.max_chunk_size:
+                yield chunk_start, chunk_end
+                chunk_start = -1
+
+            if chunk_start == -1:
+                chunk_start = unit_start
+            chunk_end = unit_end
+
+            size = chunk_end - chunk_start
+            if size >= self.min_chunk_size and self._is_cdc_boundary(text, unit_start, unit_end, size):
+                yield chunk_start, chunk_end
+                chunk_start = -1
+
+        if chunk_start != -1:
+            yield chunk_start, chunk_end
+
+    def _iter_cdc_units(self, text: str, start: int, end: int) -> Iterator[Span]:
+        """Sentences of a section, with any sentence over max_chunk_size cut
+        by length (deterministic from the sentence start, so still stable)"""
+        for para_start, para_end in self._iter_paragraph_spans(text, start, end):
+            for sent_start, sent_end in self._iter_sentence_spans(text, para_start, para_end):
+                if sent_end - sent_start <= self.max_chunk_size:
+                    yield sent_start, sent_end
+                else:
+                    yield from self._iter_length_spans(text, sent_start, sent_end)
+
+    def _is_cdc_boundary(self, text: str, start: int, end: int, size: int) -> bool:
+        """Decide from the sentence's own hash whether a chunk ends after it.
+
+        A sentence of n chars gets a cut chance of about n / avg_chunk_size
+        (as if each char had a 1/avg chance), halved while the chunk is below
+        the average size and doubled above it - FastCDC's normalized
+        chunking, which tightens the size distribution around the average.
+        """
+        digest = hashlib.blake2b(text[start:end].encode('utf-8'), digest_size=8).digest()
+        fingerprint = int.from_bytes(digest, 'big') / 2 ** 64
+
+        chance = (end - start) / self.avg_chunk_size
+        chance = chance / 2 if size < self.avg_chunk_size else chance * 2
+        return fingerprint < chance
+
+    def _iter_token_window_spans(self, text: str) -> Iterator[Tuple[Optional[str], int, int, int, int]]:
+        """Yield (title, start, end, token_count, overlap_tokens) windows.
+
+        Windows never cross a heading and always start and end on a sentence
+        boundary. Each window after the first in a section repeats the
+        trailing sentences of the previous one, up to overlap_tokens.
+        """
+        for title, start, end in self._iter_heading_spans(text):
+            if end - start < 50:
+                continue
+
+            windows = list(self._iter_section_windows(text, start, end))
+            if len(windows) == 1:
+                yield (title,) + windows[0]
+            else:
+                for window in windows:
+                    yield (None,) + window
+
+    def _iter_section_windows(self, text: str, start: int, end: int) -> Iterator[Tuple[int, int, int, int]]:
+        """Pack the sentences of one section into overlapping token windows"""
+        window = []  # (start, end, tokens) of the sentences in the window
+        window_tokens = 0
+        carried = 0  # How many leading sentences were carried over
+
+        for unit in self._iter_token_units(text, start, end):
+            tokens = unit[2]
+
+            if window and window_tokens + tokens > self.max_chunk_tokens:
+                if len(window) > carried:
+                    yield self._window_span(window, carried)
+
+                    # Carry the trailing sentences that fit in the overlap,
+                    # but never the whole window, so every window moves on
+                    keep = 0
+                    kept_tokens = 0
+                    for sentence in reversed(window[1:]):
+                        if kept_tokens + sentence[2] > self.overlap_tokens:
+                            break
+                        keep += 1
+                        kept_tokens += sentence[2]
+                    window = window[len(window) - keep:] if keep else []
+                    window_tokens = kept_tokens
+                    carried = keep
+
+                # Drop carried sentences until the new one fits
+                while window and window_tokens + tokens > self.max_chunk_tokens:
+                    window_tokens -= window.pop(0)[2]
+                    carried -= 1
+
+            window.append(unit)
+            window_tokens += tokens
+
+        if len(window) > carried:
+            yield self._window_span(window, carried)
+
+    def _iter_token_units(self, text: str, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+        """Yield (start, end, tokens) per sentence, cutting any sentence
+        longer than max_chunk_tokens by length"""
+        max_chars = max(int(self.max_chunk_tokens * self.chars_per_token), 1)
+
+        for para_start, para_end in self._iter_paragraph_spans(text, start, end):
+            for sent_start, sent_end in self._iter_sentence_spans(text, para_start, para_end):
+                tokens = self._count_tokens(text, sent_start, sent_end)
+                if tokens <= self.max_chunk_tokens:
+                    yield sent_start, sent_end, tokens
+                    continue
+
+                for piece_start, piece_end in self._iter_length_spans(text, sent_start, sent_end, max_chars):
+                    yield piece_start, piece_end, self._count_tokens(text, piece_start, piece_end)
+
+    @staticmethod
+    def _window_span(window: List[Tuple[int, int, int]], carried: int) -> Tuple[int, int, int, int]:
+        """(start, end, token_count, overlap_tokens) of a packed window"""
+        return (
+            window[0][0],
+            window[-1][1],
+            sum(unit[2] for unit in window),
+            sum(unit[2] for unit in window[:carried])
+        )
+
+    def _count_tokens(self, text: str, start: int, end: int) -> int:
+        """Token count of text[start:end], estimated from length by default"""
+        if self.token_counter:
+            return self.token_counter(text[start:end])
+        return math.ceil((end - start) / self.chars_per_token)
+
     def _clean_text(self, text: str) -> str:
         """Clean text before chunking"""
+        original = text
         # Remove null characters
         text = text.replace('\x00', '')
-        # Normalize whitespace (without regex)
-        lines = text.split('\n')
+        # Normalize whitespace (without regex) and collapse runs of blank
+        # lines, so paragraphs are always separated by exactly one blank line
         cleaned_lines = []
-        for line in lines:
+        previous_blank = False
+        for line in text.split('\n'):
             # Replace multiple spaces with single space
-            words = line.split()
-            cleaned_line = ' '.join(words)
+            cleaned_line = ' '.join(line.split())
+            if not cleaned_line:
+                if previous_blank:
+                    continue
+                previous_blank = True
+            else:
+                previous_blank = False
             cleaned_lines.append(cleaned_line)
-        text = '\n'.join(cleaned_lines)
-        return text.strip()
-    
-    def _split_by_sections(self, text: str) -> List[Dict]:
+        text = '\n'.join(cleaned_lines).strip()
+        # Hand back the caller's string when nothing changed, so chunk
+        # offsets (and ChunkTable) can share it instead of a copy
+        return original if text == original else text
+
+    def _split_by_sections(self, text: str, fallback: str = "paragraphs") -> List[Dict]:
         """Split text by section headings"""
-        
-        sections = []
-        lines = text.split('\n')
-        
-        current_section = {"title": "Introduction", "text": ""}
-        
-        for line in lines:
-            line_stripped = line.strip()
-            
-            # Check if this line looks like a heading
-            is_heading = self._is_heading(line_stripped)
-            
-            if is_heading and len(current_section["text"].strip()) > 100:
-                # Save current section and start new one
-                sections.append(current_section)
-                current_section = {"title": line_stripped[:60], "text": line + "\n"}
+        return [
+            {"title": title, "text": text[start:end], "start": start, "end": end}
+            for title, start, end in self._iter_section_spans(text, fallback)
+        ]
+
+    def _iter_section_spans(self, text: str, fallback: str = "paragraphs") -> Iterator[Tuple[str, int, int]]:
+        """Yield (title, start, end) for each section of cleaned text.
+
+        Text without headings falls back to packed paragraphs, or with
+        fallback="cdc" to content-defined spans, which stay put when
+        earlier text is edited.
+        """
+        sections = self._iter_heading_spans(text)
+        first = next(sections, None)
+        second = next(sections, None)
+
+        # If we only got one section, try splitting by double newlines
+        if second is None and len(text) > self.max_chunk_size:
+            if fallback == "cdc":
+                for order, (start, end) in enumerate(self._iter_section_cdc_spans(text, 0, len(text))):
+                    yield self._generate_title(text[start:end], order), start, end
             else:
-                current_section["text"] += line + "\n"
-        
+                yield from self._iter_paragraph_section_spans(text)
+            return
+
+        if first is not None:
+            yield first
+        if second is not None:
+            yield second
+        yield from sections
+
+    def _iter_heading_spans(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """Single pass over the lines, starting a new section at each heading
+        once the current one holds more than 100 characters"""
+        title = "Introduction"
+        start = -1  # First non-blank offset of the current section
+        end = -1    # End of its last non-blank line
+
+        pos = 0
+        length = len(text)
+        while pos <= length:
+            line_end = text.find('\n', pos)
+            if line_end == -1:
+                line_end = length
+
+            # Lines are already stripped by _clean_text, so blank means empty
+            if line_end > pos:
+                if (start != -1 and end - start > 100 and 3 <= line_end - pos <= 100
+                        and self._is_heading(text[pos:line_end])):
+                    # Save current section and start new one
+                    yield title, start, end
+                    title = text[pos:min(line_end, pos + 60)]
+                    start = pos
+                elif start == -1:
+                    start = pos
+                end = line_end
+
+            pos = line_end + 1
+
         # Don't forget the last section
-        if current_section["text"].strip():
-            sections.append(current_section)
-        
-        # If we only got one section, try splitting by double newlines
-        if len(sections) <= 1 and len(text) > self.max_chunk_size:
-            sections = self._split_by_paragraphs(text)
-        
-        return sections
-    
+        if start != -1:
+            yield title, start, end
+
+    def _iter_heading_lines(self, text: str) -> Iterator[Span]:
+        """Yield the span of every heading line in cleaned text"""
+        pos = 0
+        length = len(text)
+        while pos < length:
+            line_end = text.find('\n', pos)
+            if line_end == -1:
+                line_end = length
+            if 3 <= line_end - pos <= 100 and self._is_heading(text[pos:line_end]):
+                yield pos, line_end
+            pos = line_end + 1
+
+    def _heading_level(self, line: str) -> int:
+        """Outline depth of a heading: chapters, units, ALL CAPS and "1 ..."
+        are level 1, "Section" and "1.2 ..." level 2, "1.2.3 ..." level 3"""
+        first_part = line.split(' ', 1)[0]
+        if first_part.replace('.', '').isdigit():
+            return max(1, len([p for p in first_part.split('.') if p]))
+
+        if line.lower().startswith('section '):
+            return 2
+
+        return 1
+
     def _is_heading(self, line: str) -> bool:
         """Check if a line looks like a heading"""
         if not line or len(line) < 3 or len(line) > 100:
             return False
-        
+
         # ALL CAPS heading
         if line.isupper() and len(line) >= 3:
             return True
-        
+
         # Numbered heading: "1.", "1.1 ", etc.
         if len(line) > 3:
             # Check for patterns like "1.Title" or "1.1 Title"
@@ -138,176 +516,239 @@ class TextChunker:
                 first_part = parts[0]
                 if first_part.replace('.', '').isdigit():
                     return True
-        
+
         # Check for "Chapter" or "Section" keywords
         line_lower = line.lower()
         if line_lower.startswith('chapter ') or line_lower.startswith('section '):
             return True
-        
+
         # Check for "Unit" keyword
         if line_lower.startswith('unit '):
             return True
-        
+
         return False
-    
+
     def _split_by_paragraphs(self, text: str) -> List[Dict]:
         """Split by paragraph breaks (double newlines)"""
-        # Split by double newlines
-        parts = text.split('\n\n')
-        
-        sections = []
-        current_section = {"title": "Section 1", "text": ""}
+        return [
+            {"title": title, "text": text[start:end], "start": start, "end": end}
+            for title, start, end in self._iter_paragraph_section_spans(text)
+        ]
+
+    def _iter_paragraph_section_spans(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """Group paragraphs into "Section N" spans of at most max_chunk_size"""
         section_num = 1
-        
-        for part in parts:
-            part = part.strip()
-            if not part:
-                continue
-            
-            if len(current_section["text"]) + len(part) <= self.max_chunk_size:
-                current_section["text"] += part + "\n\n"
+        title = "Section 1"
+        start = end = -1
+        size = 0  # Length the section would have with "\n\n" after each part
+
+        for part_start, part_end in self._iter_paragraph_spans(text, 0, len(text)):
+            part_len = part_end - part_start
+
+            if size + part_len <= self.max_chunk_size:
+                if start == -1:
+                    start = part_start
+                end = part_end
+                size += part_len + 2
             else:
-                if current_section["text"].strip():
-                    sections.append(current_section)
+                if start != -1:
+                    yield title, start, end
                 section_num += 1
-                current_section = {
-                    "title": f"Section {section_num}",
-                    "text": part + "\n\n"
-                }
-        
-        if current_section["text"].strip():
-            sections.append(current_section)
-        
-        return sections
-    
+                title = f"Section {section_num}"
+                start, end, size = part_start, part_end, part_len + 2
+
+        if start != -1:
+            yield title, start, end
+
+    def _iter_paragraph_spans(self, text: str, start: int, end: int) -> Iterator[Span]:
+        """Yield stripped paragraph spans separated by blank lines"""
+        pos = start
+        while pos < end:
+            brk = text.find('\n\n', pos, end)
+            if brk == -1:
+                brk = end
+            span = self._strip_span(text, pos, brk)
+            if span:
+                yield span
+            pos = brk + 2
+
     def _split_large_text(self, text: str) -> List[str]:
         """Split large text into smaller chunks"""
-        # First try splitting by double newlines
-        paragraphs = text.split('\n\n')
-        
-        chunks = []
-        current_chunk = ""
-        
-        for para in paragraphs:
-            para = para.strip()
-            if not para:
-                continue
-            
-            if len(current_chunk) + len(para) + 2 <= self.max_chunk_size:
-                current_chunk += para + "\n\n"
+        return [text[s:e] for s, e in self._iter_large_text_spans(text, 0, len(text))]
+
+    def _iter_large_text_spans(self, text: str, start: int, end: int) -> Iterator[Span]:
+        """Pack paragraphs of text[start:end] into spans of at most
+        max_chunk_size, falling back to sentences for oversized paragraphs"""
+        chunk_start = chunk_end = -1
+        size = 0
+
+        for para_start, para_end in self._iter_paragraph_spans(text, start, end):
+            para_len = para_end - para_start
+
+            if size + para_len + 2 <= self.max_chunk_size:
+                if chunk_start == -1:
+                    chunk_start = para_start
+                chunk_end = para_end
+                size += para_len + 2
             else:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                
+                if chunk_start != -1:
+                    yield chunk_start, chunk_end
+
                 # If single paragraph is too large, split by sentences
-                if len(para) > self.max_chunk_size:
-                    sentence_chunks = self._split_by_sentences(para)
-                    chunks.extend(sentence_chunks)
-                    current_chunk = ""
+                if para_len > self.max_chunk_size:
+                    yield from self._iter_sentence_chunk_spans(text, para_start, para_end)
+                    chunk_start = chunk_end = -1
+                    size = 0
                 else:
-                    current_chunk = para + "\n\n"
-        
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        return chunks
-    
+                    chunk_start, chunk_end, size = para_start, para_end, para_len + 2
+
+        if chunk_start != -1:
+            yield chunk_start, chunk_end
+
     def _split_by_sentences(self, text: str) -> List[str]:
         """Split text by sentences (without using regex)"""
-        # Simple sentence splitting by common endings
-        sentences = []
-        current_sentence = ""
-        
-        i = 0
-        while i < len(text):
-            char = text[i]
-            current_sentence += char
-            
-            # Check for sentence ending
-            if char in '.! ?':
-                # Check if it's really end of sentence (followed by space and capital, or end of text)
-                if i + 1 >= len(text):
-                    # End of text
-                    sentences.append(current_sentence.strip())
-                    current_sentence = ""
-                elif i + 2 < len(text) and text[i + 1] == ' ' and text[i + 2].isupper():
-                    # Followed by space and capital letter
-                    sentences.append(current_sentence.strip())
-                    current_sentence = ""
-                    i += 1  # Skip the space
-            
-            i += 1
-        
-        # Don't forget remaining text
-        if current_sentence.strip():
-            sentences.append(current_sentence.strip())
-        
-        # Now group sentences into chunks
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) + 1 <= self.max_chunk_size:
-                current_chunk += sentence + " "
+        return [text[s:e] for s, e in self._iter_sentence_chunk_spans(text, 0, len(text))]
+
+    def _iter_sentence_chunk_spans(self, text: str, start: int, end: int) -> Iterator[Span]:
+        """Group the sentences of text[start:end] into spans of at most
+        max_chunk_size (a single longer sentence stays whole)"""
+        chunk_start = chunk_end = -1
+        size = 0
+        produced = False
+
+        for sent_start, sent_end in self._iter_sentence_spans(text, start, end):
+            sent_len = sent_end - sent_start
+
+            if size + sent_len + 1 <= self.max_chunk_size:
+                if chunk_start == -1:
+                    chunk_start = sent_start
+                chunk_end = sent_end
+                size += sent_len + 1
             else:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence + " "
-        
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
+                if chunk_start != -1:
+                    yield chunk_start, chunk_end
+                    produced = True
+                chunk_start, chunk_end, size = sent_start, sent_end, sent_len + 1
+
+        if chunk_start != -1:
+            yield chunk_start, chunk_end
+            produced = True
+
         # If we still have no chunks, just split by character count
-        if not chunks:
-            chunks = self._split_by_length(text)
-        
-        return chunks
-    
+        if not produced:
+            yield from self._iter_length_spans(text, start, end)
+
+    def _iter_sentence_spans(self, text: str, start: int, end: int) -> Iterator[Span]:
+        """Yield sentence spans: a sentence ends at '.', '!' or '?' followed by
+        a space and a capital letter, or at the end of the text"""
+        sent_start = start
+        for pos in heapq.merge(*(self._iter_find(text, mark, start, end) for mark in ('. ', '! ', '? '))):
+            if pos < sent_start or pos + 2 >= end or not text[pos + 2].isupper():
+                continue
+            span = self._strip_span(text, sent_start, pos + 1)
+            if span:
+                yield span
+            sent_start = pos + 2  # Skip the space
+
+        # Don't forget remaining text
+        span = self._strip_span(text, sent_start, end)
+        if span:
+            yield span
+
     def _split_by_length(self, text: str) -> List[str]:
         """Last resort: split by character count"""
-        chunks = []
-        
-        while len(text) > self.max_chunk_size:
-            # Find a good break point (space) near max_chunk_size
-            break_point = self.max_chunk_size
-            
-            # Look for a space to break at
-            while break_point > self.max_chunk_size - 200 and break_point > 0:
-                if text[break_point] == ' ':
-                    break
-                break_point -= 1
-            
-            if break_point <= 0:
-                break_point = self.max_chunk_size
-            
-            chunks.append(text[:break_point].strip())
-            text = text[break_point:].strip()
-        
-        if text:
-            chunks.append(text)
-        
-        return chunks
-    
+        return [text[s:e] for s, e in self._iter_length_spans(text, 0, len(text))]
+
+    def _iter_length_spans(self, text: str, start: int, end: int,
+                           max_size: Optional[int] = None) -> Iterator[Span]:
+        """Cut text[start:end] at a space near max_size (max_chunk_size by default)"""
+        max_size = max_size or self.max_chunk_size
+        span = self._strip_span(text, start, end)
+
+        while span and span[1] - span[0] > max_size:
+            start, end = span
+
+            # Look for a space to break at within 200 chars of the limit
+            break_point = text.rfind(' ', start + max_size - 199, start + max_size + 1)
+            if break_point == -1:
+                break_point = start + max(max_size - 200, 0)
+            if break_point <= start:
+                break_point = start + max_size
+
+            piece = self._strip_span(text, start, break_point)
+            if piece:
+                yield piece
+            span = self._strip_span(text, break_point, end)
+
+        if span:
+            yield span
+
+    @staticmethod
+    def _iter_find(text: str, sub: str, start: int, end: int) -> Iterator[int]:
+        """Yield every offset of sub inside text[start:end]"""
+        pos = text.find(sub, start, end)
+        while pos != -1:
+            yield pos
+            pos = text.find(sub, pos + 1, end)
+
+    @staticmethod
+    def _strip_span(text: str, start: int, end: int) -> Optional[Span]:
+        """Shrink a span past surrounding whitespace; None if nothing is left"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return (start, end) if start < end else None
+
     def _generate_title(self, text: str, order: int) -> str:
         """Generate a title from text content"""
         # Get first line
-        lines = text.split('\n')
-        first_line = lines[0].strip() if lines else ""
-        
+        line_end = text.find('\n')
+        first_line = (text if line_end == -1 else text[:line_end]).strip()
+
         # Clean up the first line
         # Remove leading numbers/bullets
         cleaned = first_line.lstrip('0123456789.-*# ')
-        
+
         # Get first sentence (up to first period)
-        if '.' in cleaned:
-            title = cleaned.split('.')[0].strip()
-        else:
-            title = cleaned
-        
+        title = cleaned.partition('.')[0].strip()
+
         # Limit length
         if len(title) > 60:
             title = title[:57] + "..."
         elif len(title) < 5:
             title = f"Section {order + 1}"
-        
-        return title
\ No newline at end of file
+
+        return title
+
+
+def _chunk_shared_document(job: Tuple["TextChunker", str, int, int, str]) -> ChunkTable:
+    """Process-pool worker for TextChunker.chunk_table_batch"""
+    chunker, block_name, offset, size, document_id = job
+
+    block = _attach_shared_memory(block_name)
+    try:
+        text = bytes(block.buf[offset:offset + size]).decode('utf-8')
+    finally:
+        block.close()
+
+    table = chunker.chunk_table(text, document_id)
+    if table.text is text:
+        table.text = None
+    table._generate_title = None
+    return table
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block owned by the parent without registering it with
+    this process's resource tracker, which would otherwise unlink it (and
+    warn about a leak) when a pool worker exits"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
@@ -1,21 +1,156 @@
 import os
-import PyPDF2
-from docx import Document
-from pptx import Presentation
-import openpyxl
-import filetype
+import math
+import time
+import importlib
+from contextlib import ExitStack
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from services.extraction_cache import ExtractionCache
+from services.extraction_sandbox import ExtractionSandbox, ExtractionFailed, EXTRACTION_WORKERS
+from services.pdf_processor import PDFProcessor, PDF_QUALITY_THRESHOLD, score_page_text
+
+# Parser libraries (PyPDF2, python-docx, python-pptx, openpyxl, filetype)
+# are imported inside the extractors that need them, so importing this
+# module - and starting the service - doesn't pay for all of them
+
+# Bump whenever extraction output changes, so cached text is not reused
+EXTRACTOR_VERSION = "7"
+# PDFs with at least this many pages are split into page ranges extracted
+# in parallel (on the process pool, or as separate sandbox jobs)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+# Spreadsheets/CSVs stop after this many rows per sheet or cells per file
+TABLE_MAX_ROWS = int(os.getenv("TABLE_MAX_ROWS", "100000"))
+TABLE_MAX_CELLS = int(os.getenv("TABLE_MAX_CELLS", "2000000"))
+CSV_BATCH_ROWS = 1000
+# "summary": schema + column statistics + sampled rows; "rows": every row as text
+TABLE_EXTRACT_MODE = os.getenv("TABLE_EXTRACT_MODE", "summary")
+
+
+class InvalidPageRange(Exception):
+    pass
+
+
+def _page_range_bounds(part):
+    """(start, end) of one "a-b" part of a page spec; end is None when
+    open-ended"""
+    start, dash, end = part.partition('-')
+    try:
+        start = int(start) if start else 1
+        end = (int(end) if end else None) if dash else start
+    except ValueError:
+        raise InvalidPageRange(f"Invalid page range: {part}")
+    return start, end
+
+
+def validate_page_ranges(spec, total=None):
+    """Check the syntax of a page spec and, given the document's page
+    count, that it selects at least one page; raises InvalidPageRange"""
+    if spec is None:
+        return
+    if total is not None:
+        parse_page_ranges(spec, total)
+        return
+    if isinstance(spec, int):
+        return
+    if not isinstance(spec, str):
+        raise InvalidPageRange(f"Invalid page range: {spec!r}")
+    parts = [part for part in spec.replace(' ', '').split(',') if part]
+    if not parts:
+        raise InvalidPageRange(f"Invalid page range: {spec!r}")
+    for part in parts:
+        _page_range_bounds(part)
+
+
+def parse_page_ranges(spec, total):
+    """Sorted 1-based page (slide, sheet) numbers selected by spec, e.g.
+    "1-5,8,10-" (open-ended ranges run to the last page), an int, or a
+    list of ints. None selects everything."""
+    if spec is None:
+        return list(range(1, total + 1))
+    
+    if isinstance(spec, int):
+        spec = [spec]
+    if isinstance(spec, str):
+        numbers = set()
+        for part in spec.replace(' ', '').split(','):
+            if not part:
+                continue
+            start, end = _page_range_bounds(part)
+            end = total if end is None else end
+            numbers.update(range(max(start, 1), min(end, total) + 1))
+    else:
+        numbers = {n for n in spec if 1 <= n <= total}
+    
+    if not numbers:
+        raise InvalidPageRange(f"No pages selected by {spec!r} (document has {total})")
+    return sorted(numbers)
+
+
+def split_page_numbers(page_numbers, workers):
+    """Split pages into ranges to extract in parallel. A few ranges per
+    worker evens out pages of very different cost, but each range
+    re-parses the file, so keep them at 10+ pages."""
+    page_count = len(page_numbers)
+    num_ranges = max(1, min(workers * 4, math.ceil(page_count / 10)))
+    step = math.ceil(page_count / num_ranges)
+    return [page_numbers[start:start + step] for start in range(0, page_count, step)]
+
+
+def join_pdf_pages(page_texts):
+    """Document text from its page texts, skipping empty pages"""
+    text = "\n\n".join(page_text for page_text in page_texts if page_text)
+    if not text.strip():
+        raise Exception("No text found in PDF")
+    return text.strip()
+
+
+def _extract_pdf_page_range(job):
+    """Process-pool worker: open the PDF independently and extract the given
+    pages (1-based), re-extracting low-quality pages with pdfplumber"""
+    import PyPDF2
+    
+    file_path, page_numbers, quality_threshold = job
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        pages = [pdf_reader.pages[n - 1].extract_text() or "" for n in page_numbers]
+    return PDFProcessor().repair_pages(file_path, pages, page_numbers, quality_threshold)
 
 
 class DocumentProcessor:
-    def __init__(self):
+    def __init__(self, pdf_workers=PDF_WORKERS, pdf_parallel_min_pages=PDF_PARALLEL_MIN_PAGES,
+                 cache=None, max_rows=TABLE_MAX_ROWS, max_cells=TABLE_MAX_CELLS,
+                 table_mode=TABLE_EXTRACT_MODE, pdf_quality_threshold=PDF_QUALITY_THRESHOLD,
+                 sandbox_workers=EXTRACTION_WORKERS):
         print("✅ DocumentProcessor initialized")
-        self.supported_formats = [
-            'pdf', 'docx', 'doc', 'pptx', 'ppt', 
-            'txt', 'xlsx', 'xls', 'md', 'csv'
-        ]
+        self.pdf_workers = pdf_workers
+        self.pdf_parallel_min_pages = pdf_parallel_min_pages
+        self._pdf_pool = None  # Created on the first large PDF
+        # Fast PyPDF2 pages scoring below this are redone with pdfplumber
+        self.pdf_quality_threshold = pdf_quality_threshold
+        self.pdf_processor = PDFProcessor()
+        self.cache = cache
+        self.max_rows = max_rows
+        self.max_cells = max_cells
+        if table_mode not in ("summary", "rows"):
+            raise Exception(f"Unknown table mode: {table_mode}")
+        self.table_mode = table_mode
+        self._table_summarizer = None
+        self.sandbox_workers = sandbox_workers
+        self._sandbox = None  # Created on first sandboxed extraction
+        # Threads that hash, look up the cache and wait on sandbox jobs
+        # for submit_extraction (started on first use)
+        self._coordinator = ThreadPoolExecutor(max_workers=sandbox_workers * 4,
+                                               thread_name_prefix="extraction")
+
+    @property
+    def supported_formats(self):
+        return list(EXTRACTORS)
 
     def detect_file_type(self, file_path):
         """Detect file type"""
+        import filetype
+        
         kind = filetype.guess(file_path)
         
         if kind is None:
@@ -25,58 +160,420 @@ class DocumentProcessor:
         
         return kind.extension
 
-    def extract_text(self, file_path):
-        """Universal text extraction"""
+    def extract_text(self, file_path, digest=None, pages=None):
+        """Universal text extraction. digest is the file's SHA-256 when the
+        caller already has it (e.g. hashed while uploading); pages limits
+        PDFs to those pages, presentations to those slides and workbooks
+        to those sheets (see parse_page_ranges), and is ignored by formats
+        without pages"""
         print(f"📄 Processing document: {file_path}")
         
         if not os.path.exists(file_path):
             raise Exception(f"File not found: {file_path}")
         
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache_key(digest or ExtractionCache.file_digest(file_path), pages)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"   ⚡ Extraction cache hit ({len(cached)} characters)")
+                return cached
+        
+        text = self._extract_uncached(file_path, pages)
+        
+        if self.cache:
+            self.cache.put(cache_key, text)
+        
+        return text
+
+    def cache_key(self, digest, pages=None):
+        """Cache key for a file's text under this processor's settings"""
+        return ExtractionCache.make_key(
+            digest, EXTRACTOR_VERSION, self.max_rows, self.max_cells, self.table_mode,
+            self.pdf_quality_threshold, pages
+        )
+
+    def _extract_uncached(self, file_path, pages=None):
+        """Detect the file type and run its extractor"""
         # Detect file type
         file_type = self.detect_file_type(file_path)
         print(f"   Detected type: {file_type}")
         
-        # Route to appropriate extractor
+        # Route to the registered extractor
+        extractor = EXTRACTORS.get(file_type)
+        if extractor is None:
+            raise Exception(f"Unsupported file type: {file_type}")
+        
+        if isinstance(extractor, str):
+            extractor = EXTRACTORS[file_type] = _load_extractor(extractor)
+        
+        # Only paged extractors take a page selection
+        if pages is not None and file_type in PAGED_FORMATS:
+            return extractor(self, file_path, pages=pages)
+        return extractor(self, file_path)
+
+    def iter_extract(self, file_path, pages=None):
+        """Yield {"page", "text"} dicts as the document is parsed.
+
+        PDFs are streamed page by page, so callers can start on page 1
+        while later pages are still being parsed; other formats come back
+        as a single page.
+        """
+        if not os.path.exists(file_path):
+            raise Exception(f"File not found: {file_path}")
+        
+        file_type = self.detect_file_type(file_path)
+        
         if file_type == 'pdf':
-            return self.extract_from_pdf(file_path)
-        elif file_type in ['docx', 'doc']: 
-            return self.extract_from_docx(file_path)
-        elif file_type in ['pptx', 'ppt']:
-            return self.extract_from_pptx(file_path)
-        elif file_type == 'txt': 
-            return self.extract_from_txt(file_path)
-        elif file_type in ['xlsx', 'xls']: 
-            return self.extract_from_xlsx(file_path)
-        elif file_type == 'md': 
-            return self.extract_from_txt(file_path)  # Markdown is just text
-        elif file_type == 'csv': 
-            return self.extract_from_csv(file_path)
+            for page_num, page_text in self.iter_pdf_pages(file_path, pages):
+                if page_text.strip():
+                    yield {"page": page_num, "text": page_text}
         else:
-            raise Exception(f"Unsupported file type: {file_type}")
+            yield {"page": 1, "text": self.extract_text(file_path, pages=pages)}
 
-    def extract_from_pdf(self, file_path):
-        """Extract text from PDF"""
-        print("   📕 Extracting from PDF...")
-        text = ""
+    def probe(self, file_path):
+        """Cheap metadata without extracting any text: type, size, page
+        (slide, sheet) count, outline and page sizes, for choosing ranges"""
+        if not os.path.exists(file_path):
+            raise Exception(f"File not found: {file_path}")
+        
+        file_type = self.detect_file_type(file_path)
+        info = {"file_type": file_type, "size_bytes": os.path.getsize(file_path)}
         
         try:
-            with open(file_path, 'rb') as file:
+            if file_type == 'pdf':
+                info.update(self._probe_pdf(file_path))
+            elif file_type in ('pptx', 'ppt'):
+                info.update(self._probe_pptx(file_path))
+            elif file_type in ('xlsx', 'xls'):
+                info.update(self._probe_xlsx(file_path))
+            elif file_type in ('docx', 'doc'):
+                info.update(self._probe_docx(file_path))
+        except Exception as e:
+            raise Exception(f"Metadata probe failed: {str(e)}")
+        
+        return info
+
+    def _probe_pdf(self, file_path):
+        import PyPDF2
+        
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            
+            # Page sizes in points, grouped: most documents have one or two
+            sizes = {}
+            for page in pdf_reader.pages:
+                size = (round(float(page.mediabox.width)), round(float(page.mediabox.height)))
+                sizes[size] = sizes.get(size, 0) + 1
+            
+            outline = []
+            def walk(items, level):
+                for item in items:
+                    if isinstance(item, list):
+                        walk(item, level + 1)  # Children of the previous entry
+                        continue
+                    try:
+                        page = pdf_reader.get_destination_page_number(item) + 1
+                    except Exception:
+                        page = None
+                    outline.append({"title": item.title, "level": level, "page": page})
+            walk(pdf_reader.outline, 1)
+            
+            metadata = pdf_reader.metadata
+            return {
+                "unit": "page",
+                "pages": len(pdf_reader.pages),
+                "title": metadata.title if metadata else None,
+                "author": metadata.author if metadata else None,
+                "outline": outline,
+                "page_sizes": [{"width": w, "height": h, "pages": n} for (w, h), n in sizes.items()]
+            }
+
+    def _probe_pptx(self, file_path):
+        from pptx import Presentation
+        
+        prs = Presentation(file_path)
+        outline = []
+        for slide_num, slide in enumerate(prs.slides, 1):
+            title = slide.shapes.title
+            if title is not None and title.text.strip():
+                outline.append({"title": title.text.strip(), "level": 1, "page": slide_num})
+        
+        # EMU -> points
+        width = round(prs.slide_width / 12700) if prs.slide_width else None
+        height = round(prs.slide_height / 12700) if prs.slide_height else None
+        return {
+            "unit": "slide",
+            "pages": len(prs.slides),
+            "title": prs.core_properties.title or None,
+            "author": prs.core_properties.author or None,
+            "outline": outline,
+            "page_sizes": [{"width": width, "height": height, "pages": len(prs.slides)}]
+        }
+
+    def _probe_xlsx(self, file_path):
+        import openpyxl
+        
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            # Dimensions come from each sheet's header, not its rows
+            sheets = [
+                {"name": sheet.title, "rows": sheet.max_row, "columns": sheet.max_column}
+                for sheet in workbook.worksheets
+            ]
+        finally:
+            workbook.close()
+        return {
+            "unit": "sheet",
+            "pages": len(sheets),
+            "outline": [{"title": s["name"], "level": 1, "page": n} for n, s in enumerate(sheets, 1)],
+            "sheets": sheets
+        }
+
+    def _probe_docx(self, file_path):
+        from docx import Document
+        
+        doc = Document(file_path)
+        outline = []
+        for paragraph in doc.paragraphs:
+            style = paragraph.style.name if paragraph.style is not None else ""
+            if style == "Title" or style.startswith("Heading"):
+                level = style.rsplit(' ', 1)[-1]
+                outline.append({
+                    "title": paragraph.text.strip(),
+                    "level": int(level) if level.isdigit() else 1,
+                    "page": None  # Word pages only exist once laid out
+                })
+        return {
+            "unit": None,
+            "pages": None,
+            "title": doc.core_properties.title or None,
+            "author": doc.core_properties.author or None,
+            "outline": outline,
+            "paragraphs": len(doc.paragraphs),
+            "tables": len(doc.tables)
+        }
+
+    def iter_pdf_pages(self, file_path, pages=None):
+        """Yield (page_number, text) for each (selected) PDF page as it is parsed.
+
+        Pages come from the fast PyPDF2 pass; any page scoring below
+        pdf_quality_threshold is re-extracted with pdfplumber, which is only
+        opened once the first bad page turns up.
+        """
+        import PyPDF2
+        
+        repaired = 0
+        try:
+            with ExitStack() as stack:
+                file = stack.enter_context(open(file_path, 'rb'))
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n\n"
+                fallback = None
+                
+                for page_num in parse_page_ranges(pages, len(pdf_reader.pages)):
+                    page_text = pdf_reader.pages[page_num - 1].extract_text() or ""
+                    score = score_page_text(page_text)
+                    
+                    if score < self.pdf_quality_threshold:
+                        if fallback is None:
+                            fallback = stack.enter_context(self.pdf_processor.open(file_path))
+                        retried = self.pdf_processor.extract_page(fallback, page_num)
+                        if score_page_text(retried) > score:
+                            page_text = retried
+                            repaired += 1
+                    
+                    yield page_num, page_text
         except Exception as e:
             raise Exception(f"PDF extraction failed:  {str(e)}")
         
-        if not text.strip():
-            raise Exception("No text found in PDF")
+        if repaired:
+            print(f"   🔧 Re-extracted {repaired} low-quality pages with pdfplumber")
+
+    def count_pdf_pages(self, file_path):
+        """Number of pages in a PDF (parses the page tree, not the content)"""
+        import PyPDF2
         
+        try:
+            with open(file_path, 'rb') as file:
+                return len(PyPDF2.PdfReader(file).pages)
+        except Exception as e:
+            raise Exception(f"PDF extraction failed:  {str(e)}")
+
+    def extract_from_pdf(self, file_path, pages=None):
+        """Extract text from PDF"""
+        print("   📕 Extracting from PDF...")
+        
+        page_numbers = parse_page_ranges(pages, self.count_pdf_pages(file_path))
+        
+        if self.pdf_workers > 1 and len(page_numbers) >= self.pdf_parallel_min_pages:
+            page_texts = self._extract_pdf_pages_parallel(file_path, page_numbers)
+        else:
+            page_texts = self.extract_pdf_page_texts(file_path, page_numbers)
+        
+        text = join_pdf_pages(page_texts)
         print(f"   ✅ Extracted {len(text)} characters from PDF")
-        return text.strip()
+        return text
+
+    def extract_pdf_page_texts(self, file_path, page_numbers):
+        """Text of each of the given PDF pages, in order"""
+        return [page_text for _, page_text in self.iter_pdf_pages(file_path, page_numbers)]
+
+    def _extract_pdf_pages_parallel(self, file_path, page_numbers):
+        """Extract page ranges on the process pool and merge them in page order"""
+        jobs = [
+            (file_path, range_pages, self.pdf_quality_threshold)
+            for range_pages in split_page_numbers(page_numbers, self.pdf_workers)
+        ]
+        
+        print(f"   ⚡ Splitting {len(page_numbers)} pages into {len(jobs)} ranges across {self.pdf_workers} workers")
+        
+        if self._pdf_pool is None:
+            self._pdf_pool = ProcessPoolExecutor(max_workers=self.pdf_workers)
+        
+        try:
+            pages = []
+            for range_pages in self._pdf_pool.map(_extract_pdf_page_range, jobs):
+                pages.extend(range_pages)
+            return pages
+        except Exception as e:
+            raise Exception(f"PDF extraction failed:  {str(e)}")
+
+    @property
+    def sandbox(self):
+        """Supervised worker processes (with time and memory limits) that
+        run extract_text with this processor's settings"""
+        if self._sandbox is None:
+            options = {
+                "max_rows": self.max_rows,
+                "max_cells": self.max_cells,
+                "table_mode": self.table_mode,
+                "pdf_quality_threshold": self.pdf_quality_threshold
+            }
+            self._sandbox = ExtractionSandbox(options, workers=self.sandbox_workers)
+        return self._sandbox
+
+    def submit_extraction(self, file_path, digest=None, pages=None):
+        """Queue extract_text on a sandbox worker, so a pathological document
+        can't hang or bloat the calling process. The cache is checked and
+        filled here, not in the workers. Returns a Future of (text, seconds)
+        that raises ExtractionFailed."""
+        if not os.path.exists(file_path):
+            raise ExtractionFailed("error", f"File not found: {file_path}")
+        return self._coordinator.submit(self._extract_sandboxed, file_path, digest, pages)
+
+    def _extract_sandboxed(self, file_path, digest, pages):
+        """Coordinator thread for submit_extraction"""
+        start = time.perf_counter()
+        cache_key = None
+        if self.cache:
+            try:
+                cache_key = self.cache_key(digest or ExtractionCache.file_digest(file_path), pages)
+            except OSError as e:
+                raise ExtractionFailed("error", str(e))
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"   ⚡ Extraction cache hit ({len(cached)} characters)")
+                return cached, time.perf_counter() - start
+        
+        # Split large PDFs, unless a custom PDF extractor is registered
+        if self.detect_file_type(file_path) == 'pdf' and EXTRACTORS.get('pdf') is DocumentProcessor.extract_from_pdf:
+            text, seconds = self._extract_pdf_sandboxed(file_path, pages)
+        else:
+            text, seconds = self.sandbox.submit(file_path, pages).result()
+        
+        if self.cache:
+            self.cache.put(cache_key, text)
+        return text, seconds
+
+    def _extract_pdf_sandboxed(self, file_path, pages):
+        """PDFs with pdf_parallel_min_pages+ pages are split into page
+        ranges extracted as separate sandbox jobs - in parallel, each
+        under its own time limit - and merged in page order"""
+        start = time.perf_counter()
+        page_count, _ = self.sandbox.call("count_pdf_pages", file_path).result()
+        # Raises InvalidPageRange, which callers report as a bad request
+        page_numbers = parse_page_ranges(pages, page_count)
+        if len(page_numbers) < self.pdf_parallel_min_pages:
+            return self.sandbox.submit(file_path, pages).result()
+        
+        ranges = split_page_numbers(page_numbers, self.sandbox_workers)
+        print(f"   ⚡ Splitting {len(page_numbers)} pages into {len(ranges)} sandbox jobs")
+        futures = [self.sandbox.call("extract_pdf_page_texts", file_path, range_pages)
+                   for range_pages in ranges]
+        page_texts = []
+        try:
+            for future in futures:
+                range_texts, _ = future.result()
+                page_texts.extend(range_texts)
+        finally:
+            # After a failure the remaining ranges are wasted work
+            for future in futures:
+                future.cancel()
+        
+        try:
+            text = join_pdf_pages(page_texts)
+        except Exception as e:
+            raise ExtractionFailed("error", str(e))
+        return text, time.perf_counter() - start
+
+    def extract_text_sandboxed(self, file_path, digest=None, pages=None):
+        """Blocking extract_text in the sandbox"""
+        text, _ = self.submit_extraction(file_path, digest, pages).result()
+        return text
+
+    def iter_extract_batch(self, files, max_concurrency=None):
+        """Extract many files in the sandbox, yielding a result dict per
+        file as soon as it finishes (completion order; "index" is the
+        position in files).
+
+        files holds paths or (path, sha256) pairs. At most max_concurrency
+        files (capped at the sandbox size) are in flight at once; a failing
+        file yields an error result with its failure reason and the batch
+        carries on.
+        """
+        limit = max(1, min(max_concurrency or self.sandbox_workers, self.sandbox_workers))
+        jobs = enumerate(files)
+        pending = {}
+        
+        def fill():
+            """Submit files until limit are in flight; returns the results
+            of files that fail before reaching the sandbox"""
+            failed = []
+            while len(pending) < limit:
+                index, item = next(jobs, (None, None))
+                if index is None:
+                    break
+                file_path, digest = (item, None) if isinstance(item, str) else item
+                if not os.path.exists(file_path):
+                    failed.append({"index": index, "file_path": file_path, "success": False,
+                                   "reason": "error", "error": f"File not found: {file_path}"})
+                    continue
+                pending[self.submit_extraction(file_path, digest)] = (index, file_path)
+            return failed
+        
+        try:
+            yield from fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, file_path = pending.pop(future)
+                    try:
+                        text, seconds = future.result()
+                        yield {"index": index, "file_path": file_path, "success": True,
+                               "text": text, "length": len(text), "seconds": round(seconds, 3)}
+                    except ExtractionFailed as e:
+                        yield {"index": index, "file_path": file_path, "success": False,
+                               "reason": e.reason, "error": e.detail, "seconds": e.seconds}
+                yield from fill()
+        finally:
+            # Client went away or the caller stopped early
+            for future in pending:
+                future.cancel()
 
     def extract_from_docx(self, file_path):
         """Extract text from Word document"""
+        from docx import Document
+        
         print("   📘 Extracting from DOCX...")
         text = ""
         
@@ -104,15 +601,19 @@ class DocumentProcessor:
         print(f"   ✅ Extracted {len(text)} characters from DOCX")
         return text.strip()
 
-    def extract_from_pptx(self, file_path):
-        """Extract text from PowerPoint"""
+    def extract_from_pptx(self, file_path, pages=None):
+        """Extract text from PowerPoint (pages selects slides)"""
+        from pptx import Presentation
+        
         print("   📙 Extracting from PPTX...")
         text = ""
         
         try:
             prs = Presentation(file_path)
+            slides = prs.slides
             
-            for slide_num, slide in enumerate(prs.slides, 1):
+            for slide_num in parse_page_ranges(pages, len(slides)):
+                slide = slides[slide_num - 1]
                 text += f"--- Slide {slide_num} ---\n\n"
                 
                 # Extract from shapes
@@ -153,24 +654,24 @@ class DocumentProcessor:
         print(f"   ✅ Extracted {len(text)} characters from TXT")
         return text.strip()
 
-    def extract_from_xlsx(self, file_path):
-        """Extract text from Excel"""
+    def extract_from_xlsx(self, file_path, pages=None):
+        """Extract text from Excel, streaming rows in read-only mode (pages
+        selects sheets)"""
+        import openpyxl
+        
         print("   📗 Extracting from XLSX...")
-        text = ""
         
         try: 
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
-            
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                text += f"--- Sheet: {sheet_name} ---\n\n"
-                
-                for row in sheet.iter_rows(values_only=True):
-                    row_text = " | ".join([str(cell) if cell is not None else "" for cell in row])
-                    if row_text.strip():
-                        text += row_text + "\n"
-                
-                text += "\n\n"
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                sheets = workbook.worksheets
+                text = self._render_tables(
+                    (sheets[n - 1].title, sheets[n - 1].iter_rows(values_only=True))
+                    for n in parse_page_ranges(pages, len(sheets))
+                )
+            finally:
+                # Read-only workbooks keep the file open until closed
+                workbook.close()
         
         except Exception as e:
             raise Exception(f"XLSX extraction failed: {str(e)}")
@@ -183,15 +684,13 @@ class DocumentProcessor:
 
     def extract_from_csv(self, file_path):
         """Extract text from CSV"""
+        import csv
+        
         print("   📊 Extracting from CSV...")
-        text = ""
         
         try:
-            import csv
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                reader = csv.reader(file)
-                for row in reader: 
-                    text += " | ".join(row) + "\n"
+            with open(file_path, 'r', encoding='utf-8', errors='ignore', newline='') as file:
+                text = self._render_tables([(None, csv.reader(file))])
         
         except Exception as e:
             raise Exception(f"CSV extraction failed: {str(e)}")
@@ -202,6 +701,95 @@ class DocumentProcessor:
         print(f"   ✅ Extracted {len(text)} characters from CSV")
         return text.strip()
 
+    def _render_tables(self, tables):
+        """Render (sheet title, rows) tables as text within the row and cell
+        caps: a statistics digest per table, or the rows themselves"""
+        parts = []
+        budget = {"cells": 0}
+        
+        for title, rows in tables:
+            if budget["cells"] >= self.max_cells:
+                parts.append(f"[Skipped sheet {title}: cell limit reached]\n")
+                continue
+            
+            capped = self._iter_capped_rows(rows, budget)
+            if self.table_mode == "summary":
+                # Profile first: truncation is only known once the rows are consumed
+                profile = self.table_summarizer.profile(capped)
+                # Empty tables render nothing, so a file without data still
+                # fails with "No text found"
+                if not profile["rows"] or not profile["columns"]:
+                    continue
+                parts.append(self.table_summarizer.render(profile, title, budget["truncated"]) + "\n\n")
+                continue
+            
+            if title is not None:
+                parts.append(f"--- Sheet: {title} ---\n\n")
+            # Rows are formatted a batch at a time and joined once
+            for batch in iter(lambda: list(islice(capped, CSV_BATCH_ROWS)), []):
+                parts.append("".join(
+                    row_text + "\n"
+                    for row_text in (" | ".join([str(cell) if cell is not None else "" for cell in row]) for row in batch)
+                    if row_text.strip()
+                ))
+            if budget["truncated"]:
+                parts.append(f"[Truncated after {budget['rows']} rows]\n")
+            parts.append("\n\n")
+        
+        return "".join(parts)
+
+    def _iter_capped_rows(self, rows, budget):
+        """Yield rows until the per-table row cap or the shared cell budget
+        runs out, recording whether anything was cut"""
+        budget["rows"] = 0
+        budget["truncated"] = False
+        for row in rows:
+            if budget["rows"] >= self.max_rows or budget["cells"] >= self.max_cells:
+                budget["truncated"] = True
+                return
+            budget["rows"] += 1
+            budget["cells"] += len(row)
+            yield row
+
+    @property
+    def table_summarizer(self):
+        if self._table_summarizer is None:
+            from services.table_summary import TableSummarizer
+            self._table_summarizer = TableSummarizer()
+        return self._table_summarizer
+
     def get_supported_formats(self):
         """Return list of supported formats"""
-        return self.supported_formats
\ No newline at end of file
+        return self.supported_formats
+
+
+# File type -> extractor. An extractor is called as extractor(processor,
+# file_path) and returns the text; it may also be given as a
+# "package.module:function" string, imported the first time that type is seen.
+EXTRACTORS = {}
+
+
+def register_extractor(file_types, extractor):
+    """Register an extractor for one or more file types (extensions)"""
+    for file_type in file_types:
+        EXTRACTORS[file_type.lower().lstrip('.')] = extractor
+
+
+def _load_extractor(path):
+    """Import a "package.module:function" extractor"""
+    module_name, _, attr = path.partition(':')
+    try:
+        return getattr(importlib.import_module(module_name), attr)
+    except (ImportError, AttributeError) as e:
+        raise Exception(f"Could not load extractor {path}: {str(e)}")
+
+
+# Formats whose extractor takes a pages= selection
+PAGED_FORMATS = {'pdf', 'pptx', 'ppt', 'xlsx', 'xls'}
+
+register_extractor(['pdf'], DocumentProcessor.extract_from_pdf)
+register_extractor(['docx', 'doc'], DocumentProcessor.extract_from_docx)
+register_extractor(['pptx', 'ppt'], DocumentProcessor.extract_from_pptx)
+register_extractor(['txt', 'md'], DocumentProcessor.extract_from_txt)  # Markdown is just text
+register_extractor(['xlsx', 'xls'], DocumentProcessor.extract_from_xlsx)
+register_extractor(['csv'], DocumentProcessor.extract_from_csv)
\ No newline at end of file
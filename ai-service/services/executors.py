@@ -0,0 +1,112 @@
+import os
+import time
+import asyncio
+import functools
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Threads for blocking I/O (network, disk, waiting on subprocesses); they
+# mostly sleep, so there can be many more than cores
+IO_WORKERS = int(os.getenv("IO_WORKERS", "32"))
+# Processes for CPU-bound Python, which threads can't run in parallel
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(os.cpu_count() or 1)))
+
+# Event loop lag sampling
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+LOOP_LAG_WARN_MS = float(os.getenv("LOOP_LAG_WARN_MS", "200"))
+
+
+class Executors:
+    """Where blocking work goes, so async endpoints never block the event loop.
+
+    run_io() runs a call on the I/O thread pool; run_cpu() runs a picklable
+    (module-level) function on the CPU process pool, created on first use;
+    wait() awaits a concurrent.futures.Future from a service with its own
+    workers (e.g. the extraction sandbox) without tying up a thread.
+    """
+
+    def __init__(self, io_workers: int = IO_WORKERS, cpu_workers: int = CPU_WORKERS):
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io")
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def cpu_pool(self) -> ProcessPoolExecutor:
+        if self._cpu_pool is None:
+            self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers)
+        return self._cpu_pool
+
+    async def run_io(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io_pool, functools.partial(func, *args, **kwargs))
+
+    async def run_cpu(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.cpu_pool, functools.partial(func, *args, **kwargs))
+
+    async def wait(self, future: Future):
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+
+
+class LoopLagMonitor:
+    """Measures how responsive the event loop is.
+
+    A background task sleeps for interval seconds and records how much
+    later than that it actually woke up. Anything that blocks the loop
+    shows up directly as lag; lag over warn_ms is logged.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, warn_ms: float = LOOP_LAG_WARN_MS,
+                 window: int = 600):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self.samples = deque(maxlen=window)  # Lag in ms, most recent last
+        self.max_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - start - self.interval) * 1000)
+            self.samples.append(lag_ms)
+            self.max_ms = max(self.max_ms, lag_ms)
+            if lag_ms > self.warn_ms:
+                print(f"⚠ Event loop blocked for {lag_ms:.0f} ms")
+
+    def stats(self) -> Dict:
+        if not self.samples:
+            return {"samples": 0}
+        ordered = sorted(self.samples)
+        return {
+            "samples": len(ordered),
+            "interval_ms": self.interval * 1000,
+            "last_ms": round(self.samples[-1], 2),
+            "p50_ms": round(ordered[len(ordered) // 2], 2),
+            "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 2),
+            "window_max_ms": round(ordered[-1], 2),
+            "max_ms": round(self.max_ms, 2)
+        }
@@ -0,0 +1,163 @@
+import os
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EXTRACTION_CACHE_DIR = os.getenv(
+    "EXTRACTION_CACHE_DIR",
+    str(Path(__file__).parent.parent / "outputs" / "extraction_cache")
+)
+EXTRACTION_CACHE_MAX_MB = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512"))
+
+
+class ExtractionCache:
+    """On-disk cache of extracted text keyed by file content hash.
+
+    Entries are plain UTF-8 files named after their key. The least recently
+    used entries are evicted once the store grows past max_bytes; a hit
+    refreshes the entry's mtime, which doubles as its last-access time.
+    """
+
+    label = "Extraction cache"
+    suffix = ".txt"
+
+    def __init__(self, cache_dir: str = EXTRACTION_CACHE_DIR,
+                 max_bytes: int = EXTRACTION_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, list] = {}  # key -> [size, last_access]
+        self._total_bytes = 0
+        self._scan()
+
+        print(f"🗄️ {self.label}: {len(self._entries)} entries, "
+              f"{self._total_bytes / 1024 / 1024:.1f}/{max_bytes / 1024 / 1024:.0f} MB")
+
+    @staticmethod
+    def file_digest(file_path: str) -> str:
+        """SHA-256 of a file, read in 1 MB blocks"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Cache key from a file digest plus anything else that changes the
+        output (extractor version, page range...)"""
+        return hashlib.sha256(":".join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+    def get(self, key: str, count: bool = True) -> Optional[str]:
+        """Cached text for key, or None. count=False leaves the hit/miss
+        stats alone, for callers that record one result over several
+        lookups (see record_lookup)"""
+        path = self.cache_dir / f"{key}{self.suffix}"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Also covers entries evicted by another worker process
+            with self._lock:
+                if count:
+                    self.misses += 1
+                entry = self._entries.pop(key, None)
+                if entry:
+                    self._total_bytes -= entry[0]
+            return None
+
+        with self._lock:
+            if count:
+                self.hits += 1
+            entry = self._entries.get(key)
+            if entry:
+                entry[1] = time.time()
+        return text
+
+    def put(self, key: str, text: str):
+        """Store text under key, evicting old entries if over budget"""
+        data = text.encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+
+        path = self.cache_dir / f"{key}{self.suffix}"
+        temp_path = self.cache_dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous:
+                self._total_bytes -= previous[0]
+            self._entries[key] = [len(data), time.time()]
+            self._total_bytes += len(data)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def record_lookup(self, hit: bool):
+        """Count one hit or miss"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def remove(self, key: str):
+        """Delete the entry for key, if any"""
+        try:
+            os.remove(self.cache_dir / f"{key}{self.suffix}")
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._total_bytes -= entry[0]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _scan(self):
+        """Rebuild the index from disk (other processes share the directory)"""
+        self._entries = {}
+        self._total_bytes = 0
+        for path in self.cache_dir.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            self._entries[path.stem] = [stat.st_size, stat.st_mtime]
+            self._total_bytes += stat.st_size
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes (lock held)"""
+        self._scan()
+        for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self.cache_dir / f"{key}{self.suffix}")
+            except FileNotFoundError:
+                pass
+            del self._entries[key]
+            self._total_bytes -= size
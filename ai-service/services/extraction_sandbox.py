@@ -0,0 +1,258 @@
+import os
+import time
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import Future
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+# Per-job limits; the worker is killed (and replaced) when either is exceeded
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "120"))
+EXTRACTION_MAX_RSS_MB = int(os.getenv("EXTRACTION_MAX_RSS_MB", "1024"))  # 0 disables
+# How often a running job's worker is checked
+POLL_SECONDS = 0.1
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class ExtractionFailed(Exception):
+    """Extraction did not produce text. reason is one of "error" (the
+    extractor raised), "timeout", "memory_limit" or "crashed"."""
+
+    def __init__(self, reason: str, detail: str, seconds: Optional[float] = None):
+        super().__init__(detail)
+        self.reason = reason
+        self.detail = detail
+        self.seconds = seconds
+
+    def to_dict(self) -> Dict:
+        return {"reason": self.reason, "detail": self.detail, "seconds": self.seconds}
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Resident memory of a process, or None when it can't be read.
+
+    Counts only the worker's private pages where Linux reports them:
+    forked workers share the server's pages copy-on-write, which would
+    otherwise count against every worker's cap.
+    """
+    try:
+        private = 0
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                    private += int(line.split()[1]) * 1024
+        return private
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return None
+
+
+def _sandbox_worker(conn, options):
+    """Worker process: run the DocumentProcessor calls sent over conn
+    until told to stop"""
+    from services.document_processor import DocumentProcessor
+
+    # No nested PDF pool: the sandbox's workers are the parallelism. No
+    # cache either: the caller checks and fills it, so its stats see
+    # every extraction
+    processor = DocumentProcessor(pdf_workers=1, **options)
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        method, args = job
+        start = time.perf_counter()
+        try:
+            result = getattr(processor, method)(*args)
+            conn.send(("ok", result, time.perf_counter() - start))
+        except MemoryError:
+            conn.send(("failed", "memory_limit", "Worker ran out of memory"))
+            return  # The heap may be in a bad state; let the sandbox replace us
+        except Exception as e:
+            conn.send(("failed", "error", str(e)))
+
+
+class ExtractionSandbox:
+    """Supervised pool of extraction worker processes.
+
+    Each worker runs DocumentProcessor calls (extract_text, mostly) in
+    its own process, watched by a supervisor thread. A job that runs past
+    its timeout or whose worker grows past max_rss_bytes gets the worker
+    killed and replaced, and the job fails with a structured
+    ExtractionFailed, so a pathological document can't take the service
+    down with it.
+    Workers are started lazily and reused across jobs.
+    """
+
+    def __init__(self, options: Dict, workers: int = EXTRACTION_WORKERS,
+                 timeout: float = EXTRACTION_TIMEOUT_SECONDS,
+                 max_rss_bytes: int = EXTRACTION_MAX_RSS_MB * 1024 * 1024):
+        self.options = options
+        self.workers = workers
+        self.timeout = timeout
+        self.max_rss_bytes = max_rss_bytes
+
+        # Platform default start method, like the other pools in this service
+        self._context = multiprocessing.get_context()
+        self._jobs = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self.stats = {"completed": 0, "failed": 0, "timeouts": 0, "memory_kills": 0,
+                      "crashes": 0, "restarts": 0}
+
+    def submit(self, file_path: str, pages=None, timeout: Optional[float] = None) -> Future:
+        """Queue an extraction; the future resolves to (text, seconds) or
+        raises ExtractionFailed"""
+        return self.call("extract_text", file_path, None, pages, timeout=timeout)
+
+    def call(self, method: str, *args, timeout: Optional[float] = None) -> Future:
+        """Queue DocumentProcessor.method(*args) on a worker; the future
+        resolves to (result, seconds) or raises ExtractionFailed"""
+        self._start()
+        future = Future()
+        self._jobs.put((future, (method, args), timeout or self.timeout))
+        return future
+
+    def extract(self, file_path: str, pages=None, timeout: Optional[float] = None) -> str:
+        """Blocking extraction in the sandbox"""
+        text, _ = self.submit(file_path, pages, timeout).result()
+        return text
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"workers": self.workers, "timeout": self.timeout,
+                    "max_rss_bytes": self.max_rss_bytes, **self.stats}
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._supervise, name=f"extraction-sandbox-{index}",
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            print(f"🧱 Extraction sandbox: {self.workers} workers, {self.timeout:g}s timeout, "
+                  f"{self.max_rss_bytes // (1024 * 1024)} MB RSS cap")
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_sandbox_worker, args=(child_conn, self.options),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _kill(self, process, conn):
+        process.kill()
+        process.join()
+        conn.close()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _supervise(self):
+        """Supervisor thread: owns one worker process, runs queued jobs on
+        it and replaces it whenever it has to be killed"""
+        process = conn = None
+
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future, args, timeout = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            if process is not None and not process.is_alive():
+                # Died while idle
+                self._count("restarts")
+                conn.close()
+                process = None
+            if process is None:
+                process, conn = self._spawn()
+
+            start = time.monotonic()
+            failure = None
+            result = None
+            try:
+                conn.send(args)
+                while failure is None and result is None:
+                    if conn.poll(POLL_SECONDS):
+                        result = conn.recv()
+                        break
+
+                    elapsed = time.monotonic() - start
+                    rss = _rss_bytes(process.pid) if self.max_rss_bytes else None
+                    if not process.is_alive():
+                        failure = ExtractionFailed("crashed", f"Worker exited with code {process.exitcode}")
+                    elif elapsed > timeout:
+                        failure = ExtractionFailed("timeout", f"Extraction took longer than {timeout:g}s")
+                    elif rss and rss > self.max_rss_bytes:
+                        failure = ExtractionFailed(
+                            "memory_limit",
+                            f"Worker used {rss // (1024 * 1024)} MB (limit {self.max_rss_bytes // (1024 * 1024)} MB)"
+                        )
+            except (EOFError, OSError):
+                # Died mid-job (e.g. killed by the OS); exitcode says how
+                process.join(1)
+                failure = ExtractionFailed("crashed", f"Worker exited with code {process.exitcode}")
+
+            if result is not None and result[0] == "ok":
+                self._count("completed")
+                future.set_result((result[1], result[2]))
+                continue
+
+            if result is not None:
+                failure = ExtractionFailed(result[1], result[2])
+            failure.seconds = round(time.monotonic() - start, 3)
+
+            self._count("failed")
+            if failure.reason != "error":
+                # Only an extractor exception leaves the worker reusable
+                self._count({"timeout": "timeouts", "memory_limit": "memory_kills",
+                             "crashed": "crashes"}[failure.reason])
+                self._count("restarts")
+                self._kill(process, conn)
+                process = conn = None
+                print(f"   ⚠ Extraction worker replaced ({failure.reason}): {failure.detail}")
+
+            future.set_exception(failure)
+
+        if process is not None:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            process.join(5)
+            if process.is_alive():
+                self._kill(process, conn)
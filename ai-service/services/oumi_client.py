@@ -43,7 +43,7 @@ class OumiClient:
         if response_format:
             payload["response_format"] = response_format
         
-        async with httpx.AsyncClient(timeout=120. 0) as client:
+        async with httpx.AsyncClient(timeout=120.0) as client:
             response = await client.post(
                 f"{self.base_url}/chat/completions",
                 headers=self.headers,
@@ -61,7 +61,8 @@ class OumiClient:
         text: str,
         voice:  str = "alloy",
         model: str = "tts-1",
-        speed: float = 1.0
+        speed: float = 1.0,
+        response_format: str = "mp3"
     ) -> bytes:
         """Generate speech from text using Oumi TTS"""
         
@@ -69,7 +70,8 @@ class OumiClient:
             "model": model,
             "input": text,
             "voice":  voice,
-            "speed": speed
+            "speed": speed,
+            "response_format": response_format
         }
         
         async with httpx.AsyncClient(timeout=180.0) as client:
@@ -0,0 +1,118 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence
+
+
+class OutlineNode:
+    """One heading in a document outline. start/end span the heading and
+    everything up to the next heading at the same or a higher level;
+    chunk_start/chunk_end is the range of chunks overlapping that span."""
+
+    __slots__ = ("index", "level", "title", "start", "end",
+                 "chunk_start", "chunk_end", "parent", "children")
+
+    def __init__(self, index: int, level: int, title: str, start: int,
+                 parent: Optional["OutlineNode"]):
+        self.index = index
+        self.level = level
+        self.title = title
+        self.start = start
+        self.end = start
+        self.chunk_start = 0
+        self.chunk_end = 0
+        self.parent = parent
+        self.children: List["OutlineNode"] = []
+
+    def to_dict(self) -> Dict:
+        return {
+            "level": self.level,
+            "title": self.title,
+            "start": self.start,
+            "end": self.end,
+            "chunk_start": self.chunk_start,
+            "chunk_end": self.chunk_end,
+            "children": [child.to_dict() for child in self.children]
+        }
+
+    def __repr__(self) -> str:
+        return f"OutlineNode(level={self.level}, title={self.title!r}, start={self.start}, end={self.end})"
+
+
+class DocumentOutline:
+    """Heading hierarchy of a document, indexed for O(log n) lookups by
+    text offset, by chunk and by title"""
+
+    def __init__(self, nodes: List[OutlineNode], text_length: int):
+        # Nodes are in document order (a pre-order walk of the tree)
+        self.nodes = nodes
+        self.roots = [node for node in nodes if node.parent is None]
+        self.text_length = text_length
+        self._starts = [node.start for node in nodes]
+        self._by_title: Dict[str, List[OutlineNode]] = {}
+        for node in nodes:
+            self._by_title.setdefault(node.title.lower(), []).append(node)
+
+    @classmethod
+    def build(cls, headings: Sequence, text_length: int,
+              chunk_starts: Sequence[int] = (), chunk_ends: Sequence[int] = ()) -> "DocumentOutline":
+        """Build the tree from (level, title, start) headings in document
+        order, mapping each section to the chunks it overlaps"""
+        nodes = []
+        stack = []
+        for level, title, start in headings:
+            # Close every open section at this level or deeper
+            while stack and stack[-1].level >= level:
+                stack.pop().end = start
+            parent = stack[-1] if stack else None
+            node = OutlineNode(len(nodes), level, title, start, parent)
+            if parent:
+                parent.children.append(node)
+            nodes.append(node)
+            stack.append(node)
+
+        for node in stack:
+            node.end = text_length
+
+        # chunk_ends is sorted like chunk_starts, since chunks never nest
+        for node in nodes:
+            node.chunk_start = bisect_right(chunk_ends, node.start)
+            node.chunk_end = bisect_left(chunk_starts, node.end)
+
+        return cls(nodes, text_length)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def find(self, offset: int) -> Optional[OutlineNode]:
+        """Deepest section containing a text offset"""
+        index = bisect_right(self._starts, offset) - 1
+        if index < 0:
+            return None
+
+        # The nearest heading before the offset may have closed already;
+        # its ancestors are the only other candidates
+        node = self.nodes[index]
+        while node and not node.start <= offset < node.end:
+            node = node.parent
+        return node
+
+    def find_chunk(self, chunk_index: int, chunk_starts: Sequence[int]) -> Optional[OutlineNode]:
+        """Deepest section a chunk starts in"""
+        return self.find(chunk_starts[chunk_index])
+
+    def find_title(self, title: str) -> List[OutlineNode]:
+        """Sections whose heading matches title (case-insensitive)"""
+        return self._by_title.get(title.strip().lower(), [])
+
+    def path(self, node: OutlineNode) -> List[str]:
+        """Titles from the top-level section down to node"""
+        titles = []
+        while node:
+            titles.append(node.title)
+            node = node.parent
+        return titles[::-1]
+
+    def to_dict(self) -> Dict:
+        return {
+            "sections": len(self.nodes),
+            "outline": [root.to_dict() for root in self.roots]
+        }
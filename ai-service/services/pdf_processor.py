@@ -1,29 +1,126 @@
-import pdfplumber
+import os
 import re
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Sequence
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# pdfplumber is imported on first use; it is much slower to load (and to
+# run) than PyPDF2, and DocumentProcessor only needs it for bad pages
+
+# Pages scoring below this (0-1) are re-extracted with pdfplumber; 0 disables
+PDF_QUALITY_THRESHOLD = float(os.getenv("PDF_QUALITY_THRESHOLD", "0.6"))
+# Pages with less text than this (headings, page numbers) are too short to
+# judge word spacing on
+PDF_MIN_PAGE_CHARS = 20
+# Signs of broken spacing, needed before word lengths count against a page:
+# share of tokens that are single letters next to another single letter
+# ("T h e c e l l"), or share of letters in words longer than
+# GLUED_WORD_CHARS (whole glued lines; German compounds stay shorter)
+SPLIT_MIN_RATIO = 0.3
+GLUED_MIN_RATIO = 0.5
+GLUED_WORD_CHARS = 40
+
+# Control characters, replacement characters, private-use glyphs and
+# unmapped "(cid:N)" codes left behind by fonts without a Unicode map
+_GARBAGE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffd\ue000-\uf8ff]|\(cid:\d+\)')
+# Scripts written without spaces between words (Chinese, Japanese, Thai,
+# Lao, Myanmar, Khmer), where word length says nothing about extraction
+_NON_SPACING = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+                          r'\u0e00-\u0eff\u1000-\u109f\u1780-\u17ff]')
+# Tokens that are legitimately long: URLs, e-mail addresses, paths
+_LONG_TOKEN = re.compile(r'^\W*(\w+://|www\.)|@|[/\\]\S*[/\\]')
+
+
+def score_page_text(text: str) -> float:
+    """Heuristic quality of a page's extracted text, from 0 (unusable) to 1.
+
+    Penalizes empty pages, garbage characters, and broken spacing: runs
+    of glued-together words, or text split into single characters. Word
+    lengths only count once one of those shows up, so formulas, long
+    compound words and short pages keep their score. The spacing checks
+    are skipped for text mostly in scripts that don't separate words, and
+    ignore URLs and paths.
+    """
+    stripped = text.strip()
+    if not stripped:
+        return 0.0
+
+    garbage = len(stripped) - len(_GARBAGE.sub('', stripped))
+    penalty = 4 * garbage / len(stripped)
+    if len(stripped) < PDF_MIN_PAGE_CHARS:
+        return max(0.0, 1.0 - penalty)
+
+    words = stripped.split()
+    letters = sum(len(word) for word in words)
+    if len(_NON_SPACING.findall(stripped)) > 0.3 * letters:
+        return max(0.0, 1.0 - penalty)
+
+    words = [word for word in words if not _LONG_TOKEN.search(word)]
+    if not words:
+        return max(0.0, 1.0 - penalty)
+    letters = sum(len(word) for word in words)
+    singles = [len(word) == 1 and word.isalpha() for word in words]
+    split = sum(
+        1 for i, single in enumerate(singles)
+        if single and ((i > 0 and singles[i - 1]) or (i + 1 < len(singles) and singles[i + 1]))
+    ) / len(words)
+    glued = sum(len(word) for word in words if len(word) > GLUED_WORD_CHARS) / letters
+    if split < SPLIT_MIN_RATIO and glued < GLUED_MIN_RATIO:
+        return max(0.0, 1.0 - penalty)
+
+    avg_word = letters / len(words)
+    penalty += split + sum(len(word) for word in words if len(word) > 25) / letters
+    if avg_word < 2.5:
+        penalty += (2.5 - avg_word) / 1.5
+    elif avg_word > 10:
+        penalty += (avg_word - 10) / 10
+
+    return max(0.0, 1.0 - penalty)
 
 
 class PDFProcessor:
     def __init__(self):
         pass
     
-    def extract_text(self, file_path: str) -> Dict:
-        """Extract text from PDF using pdfplumber"""
+    def open(self, file_path: str):
+        """Open a PDF with pdfplumber (use as a context manager)"""
+        import pdfplumber
+        return pdfplumber.open(file_path)
+    
+    def extract_page(self, pdf, page_number: int) -> str:
+        """Cleaned text of one page (1-based) of an open PDF"""
+        return self._clean_text(pdf.pages[page_number - 1].extract_text() or "")
+    
+    def extract_pages(self, file_path: str, page_numbers: Iterable[int]) -> Dict[int, str]:
+        """Cleaned text of selected pages (1-based), parsing only those pages"""
+        try:
+            with self.open(file_path) as pdf:
+                return {n: self.extract_page(pdf, n) for n in page_numbers}
+        except Exception as e:
+            raise Exception(f"PDF processing error: {str(e)}")
+    
+    def extract_text(self, file_path: str, pages: Optional[Iterable[int]] = None) -> Dict:
+        """Extract text from PDF using pdfplumber, optionally only the given
+        pages (1-based)"""
         try:
             text_content = []
             metadata = {}
             
-            with pdfplumber.open(file_path) as pdf:
+            with self.open(file_path) as pdf:
                 metadata = {
                     "total_pages": len(pdf.pages),
                 }
                 
-                for i, page in enumerate(pdf.pages):
-                    page_text = page.extract_text() or ""
-                    if page_text.strip():
+                page_numbers = range(1, len(pdf.pages) + 1) if pages is None else pages
+                for page_number in page_numbers:
+                    if not 1 <= page_number <= len(pdf.pages):
+                        raise Exception(f"Page {page_number} out of range (1-{len(pdf.pages)})")
+                    page_text = self.extract_page(pdf, page_number)
+                    if page_text:
                         text_content.append({
-                            "page_number": i + 1,
-                            "text": self._clean_text(page_text)
+                            "page_number": page_number,
+                            "text": page_text
                         })
             
             # Combine all text
@@ -39,6 +136,30 @@ class PDFProcessor:
         except Exception as e:
             raise Exception(f"PDF processing error: {str(e)}")
     
+    def repair_pages(self, file_path: str, pages: List[str], page_numbers: Sequence[int],
+                     threshold: float = PDF_QUALITY_THRESHOLD) -> List[str]:
+        """Re-extract pages whose fast-path text scores below threshold.
+        
+        pages holds the text of the pages numbered page_numbers (1-based);
+        a page is replaced only when pdfplumber's text scores higher.
+        """
+        if threshold <= 0:
+            return pages
+        
+        scores = [score_page_text(page_text) for page_text in pages]
+        low = [i for i, score in enumerate(scores) if score < threshold]
+        if not low:
+            return pages
+        
+        print(f"   🔧 Re-extracting {len(low)} low-quality pages with pdfplumber")
+        repaired = list(pages)
+        retried = self.extract_pages(file_path, [page_numbers[i] for i in low])
+        for i in low:
+            page_text = retried[page_numbers[i]]
+            if score_page_text(page_text) > scores[i]:
+                repaired[i] = page_text
+        return repaired
+    
     def _clean_text(self, text: str) -> str:
         """Clean extracted text"""
         # Remove multiple spaces
@@ -49,4 +170,4 @@ class PDFProcessor:
         text = re.sub(r'\n\d+\n', '\n', text)
         # Strip whitespace
         text = text.strip()
-        return text
\ No newline at end of file
+        return text
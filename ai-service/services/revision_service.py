@@ -0,0 +1,321 @@
+import os
+import re
+import json
+import asyncio
+import difflib
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from services.chunking import TextChunker
+
+load_dotenv()
+
+REVISION_LLM_CONCURRENCY = int(os.getenv("REVISION_LLM_CONCURRENCY", "4"))
+
+# Sections are the unit of regeneration; keep each one within the amount of
+# text ContentGenerator sends to the model (8000 chars for notes)
+SECTION_UNIT_CHARS = 8000
+# Neighbouring headings are grouped into sections; about 1 in this many
+# (by hash) ends a group once it holds a quarter of SECTION_UNIT_CHARS
+SECTION_BOUNDARY_ODDS = 4
+
+# Document ids name files in the store, so nothing that could leave it
+DOCUMENT_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class InvalidDocumentId(Exception):
+    pass
+
+
+def _split_sections(splitter: TextChunker, text: str) -> List[Dict]:
+    """Split text into hashed sections using the chunker's heading detection"""
+    text = splitter._clean_text(text)
+
+    spans = []
+    for section in splitter._split_by_sections(text, fallback="cdc"):
+        start, end = section["start"], section["end"]
+        if end - start < 50:
+            continue
+
+        # Oversized sections are cut at content-defined points
+        if end - start > SECTION_UNIT_CHARS:
+            section_spans = list(splitter._iter_section_cdc_spans(text, start, end))
+        else:
+            section_spans = [(start, end)]
+
+        for span_start, span_end in section_spans:
+            spans.append({
+                "title": section["title"],
+                "start": span_start,
+                "end": span_end,
+                "hash": hashlib.sha256(text[span_start:span_end].encode('utf-8')).hexdigest()
+            })
+
+    return [_make_section(text, group) for group in _group_spans(spans)]
+
+
+def _group_spans(spans: List[Dict]) -> List[List[Dict]]:
+    """Group neighbouring heading spans into sections of up to
+    SECTION_UNIT_CHARS. Group boundaries are picked by the spans' content
+    hashes, so an edit only regroups the spans around it."""
+    groups = []
+    group = []
+    for span in spans:
+        if group and span["end"] - group[0]["start"] > SECTION_UNIT_CHARS:
+            groups.append(group)
+            group = []
+        group.append(span)
+
+        if (span["end"] - group[0]["start"] >= SECTION_UNIT_CHARS // 4
+                and int(span["hash"][:8], 16) % SECTION_BOUNDARY_ODDS == 0):
+            groups.append(group)
+            group = []
+
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _make_section(text: str, group: List[Dict]) -> Dict:
+    section_text = text[group[0]["start"]:group[-1]["end"]]
+    title = group[0]["title"]
+    if group[-1]["title"] != title:
+        title = f"{title} - {group[-1]['title']}"
+    return {
+        "title": title,
+        "text": section_text,
+        "hash": hashlib.sha256(section_text.encode('utf-8')).hexdigest()
+    }
+
+
+def _chunk_section(chunker: TextChunker, text: str, document_id: str) -> List[Dict]:
+    return list(chunker.iter_chunks(text, document_id))
+
+
+class RevisionService:
+    """Incremental processing of new versions of a document.
+
+    Each revision is split into sections (neighbouring headings grouped
+    up to SECTION_UNIT_CHARS), and notes, quiz questions, flashcards and
+    chunks are stored per section under the section's content hash. The
+    requested question and card counts are shared out between sections
+    by size. A new revision only regenerates sections whose hash is new;
+    unchanged (or moved) sections reuse the stored artifacts.
+    """
+
+    def __init__(self, content_generator, chunker: Optional[TextChunker] = None, executors=None):
+        self.content_generator = content_generator
+        self.chunker = chunker or TextChunker(mode="cdc")
+        # Section splitting and chunking go to the CPU pool when available
+        self.executors = executors
+
+        # Splits revisions into LLM-sized sections; headingless text falls
+        # back to content-defined spans so an edit doesn't shift the rest
+        self.section_splitter = TextChunker(
+            max_chunk_size=SECTION_UNIT_CHARS,
+            min_chunk_size=SECTION_UNIT_CHARS // 4,
+            avg_chunk_size=SECTION_UNIT_CHARS // 2,
+            mode="cdc"
+        )
+
+        self.store_dir = Path(os.getenv(
+            "REVISION_STORE_DIR",
+            Path(__file__).parent.parent / "outputs" / "revisions"
+        ))
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+        print(f"✅ RevisionService initialized (store: {self.store_dir})")
+
+    def split_sections(self, text: str) -> List[Dict]:
+        """Split text into hashed sections using the chunker's heading detection"""
+        return _split_sections(self.section_splitter, text)
+
+    def diff_sections(self, old_hashes: List[str], new_hashes: List[str]) -> Dict:
+        """Section-level diff between two revisions"""
+        matcher = difflib.SequenceMatcher(a=old_hashes, b=new_hashes, autojunk=False)
+
+        unchanged = changed = removed = 0
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                unchanged += j2 - j1
+            else:
+                changed += j2 - j1
+                removed += i2 - i1
+
+        # Sections that only moved still count as reusable
+        old_set = set(old_hashes)
+        reusable = sum(1 for h in new_hashes if h in old_set)
+
+        return {
+            "sections": len(new_hashes),
+            "unchanged": unchanged,
+            "changed": changed,
+            "removed": removed,
+            "reusable": reusable,
+            "regenerated": len(new_hashes) - reusable
+        }
+
+    def revision_path(self, document_id: str) -> Path:
+        """Store file of a document's revision; raises InvalidDocumentId
+        unless the id is only letters, digits, dashes and underscores"""
+        if not isinstance(document_id, str) or not DOCUMENT_ID_PATTERN.fullmatch(document_id):
+            raise InvalidDocumentId(f"Invalid document id: {document_id!r}")
+        return self.store_dir / f"{document_id}.json"
+
+    def load_revision(self, document_id: str) -> Optional[Dict]:
+        """Load the stored revision of a document, if any"""
+        path = self.revision_path(document_id)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠ Could not read revision for {document_id}: {e}")
+            return None
+
+    def save_revision(self, document_id: str, record: Dict):
+        """Atomically replace the stored revision of a document"""
+        path = self.revision_path(document_id)
+        temp_path = path.with_suffix(".json.tmp")
+
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f)
+        os.replace(temp_path, path)
+
+    async def process_revision(self, document_id: str, text: str, filename: str,
+                               num_questions: int = 10, num_cards: int = 15,
+                               base_document_id: Optional[str] = None) -> Dict:
+        """Generate notes, quiz, flashcards and chunks for a new revision,
+        reusing everything stored for sections that did not change"""
+        print(f"🔁 Processing revision of: {filename}")
+        # Before any generation, so a bad id doesn't waste LLM calls
+        self.revision_path(document_id)
+
+        previous = self.load_revision(base_document_id or document_id) or {"sections": [], "artifacts": {}}
+        sections = await self._run_cpu(_split_sections, self.section_splitter, text)
+        if not sections:
+            raise Exception("No text content to process")
+
+        diff = self.diff_sections(
+            [s["hash"] for s in previous["sections"]],
+            [s["hash"] for s in sections]
+        )
+        print(f"   {diff['sections']} sections: {diff['reusable']} reused, {diff['regenerated']} to regenerate")
+
+        sizes = [len(s["text"]) for s in sections]
+        question_counts = self._distribute(num_questions, sizes)
+        card_counts = self._distribute(num_cards, sizes)
+
+        semaphore = asyncio.Semaphore(REVISION_LLM_CONCURRENCY)
+        results = await asyncio.gather(*[
+            self._section_artifacts(
+                section, previous["artifacts"].get(section["hash"]),
+                document_id, filename, section_questions, section_cards, semaphore
+            )
+            for section, section_questions, section_cards in zip(sections, question_counts, card_counts)
+        ])
+
+        # Assemble document-level outputs in section order
+        notes = "\n\n".join(r["notes"] for r in results if r["notes"])
+        questions = self._round_robin(
+            [r["questions"][:n] for r, n in zip(results, question_counts)], num_questions
+        )
+        flashcards = self._round_robin(
+            [r["flashcards"][:n] for r, n in zip(results, card_counts)], num_cards
+        )
+
+        chunks = []
+        for r in results:
+            for chunk in r["chunks"]:
+                chunks.append(dict(chunk, document_id=document_id, order=len(chunks)))
+
+        # Only the current sections' artifacts are kept
+        self.save_revision(document_id, {
+            "document_id": document_id,
+            "sections": [{"title": s["title"], "hash": s["hash"]} for s in sections],
+            "artifacts": {s["hash"]: r for s, r in zip(sections, results)}
+        })
+
+        print(f"✅ Revision processed: {len(chunks)} chunks, {len(questions)} questions, {len(flashcards)} flashcards")
+
+        return {
+            "notes": notes,
+            "questions": questions,
+            "flashcards": flashcards,
+            "chunks": chunks,
+            "revision": diff
+        }
+
+    async def _section_artifacts(self, section: Dict, stored: Optional[Dict],
+                                 document_id: str, filename: str,
+                                 section_questions: int, section_cards: int,
+                                 semaphore: asyncio.Semaphore) -> Dict:
+        """Reuse or generate the artifacts of one section. Stored questions
+        and cards are reused when at least as many were generated as the
+        section now needs (the caller takes the first ones)."""
+        stored = stored or {}
+        label = f"{filename} - {section['title']}"
+        reuse_questions = stored.get("questions") is not None and stored.get("num_questions", 0) >= section_questions
+        reuse_cards = stored.get("flashcards") is not None and stored.get("num_cards", 0) >= section_cards
+
+        artifacts = {
+            "num_questions": stored["num_questions"] if reuse_questions else section_questions,
+            "num_cards": stored["num_cards"] if reuse_cards else section_cards,
+            "notes": stored.get("notes"),
+            "questions": stored["questions"] if reuse_questions else None,
+            "flashcards": stored["flashcards"] if reuse_cards else None,
+            "chunks": stored.get("chunks")
+        }
+
+        if artifacts["chunks"] is None:
+            artifacts["chunks"] = await self._run_cpu(_chunk_section, self.chunker, section["text"], document_id)
+
+        async with semaphore:
+            if artifacts["notes"] is None:
+                artifacts["notes"] = await self.content_generator.generate_notes(section["text"], label)
+            # Sections too small for a share of the questions or cards get none
+            if artifacts["questions"] is None:
+                artifacts["questions"] = (
+                    await self.content_generator.generate_quiz(section["text"], section_questions)
+                    if section_questions else []
+                )
+            if artifacts["flashcards"] is None:
+                artifacts["flashcards"] = (
+                    await self.content_generator.generate_flashcards(section["text"], section_cards)
+                    if section_cards else []
+                )
+
+        return artifacts
+
+    async def _run_cpu(self, func, *args):
+        if self.executors:
+            return await self.executors.run_cpu(func, *args)
+        return func(*args)
+
+    def _distribute(self, total: int, sizes: List[int]) -> List[int]:
+        """Share total items out between sections in proportion to their
+        sizes (largest remainder), so the counts add up to total"""
+        size_sum = sum(sizes)
+        if not size_sum:
+            return [0] * len(sizes)
+        quotas = [total * size / size_sum for size in sizes]
+        counts = [int(quota) for quota in quotas]
+        by_remainder = sorted(range(len(sizes)), key=lambda i: counts[i] - quotas[i])
+        for i in by_remainder[:total - sum(counts)]:
+            counts[i] += 1
+        return counts
+
+    def _round_robin(self, groups: List[List], limit: int) -> List:
+        """Take items from each section in turn so the result covers the
+        whole document"""
+        picked = []
+        depth = 0
+        while len(picked) < limit and any(depth < len(g) for g in groups):
+            for group in groups:
+                if depth < len(group) and len(picked) < limit:
+                    picked.append(group[depth])
+            depth += 1
+        return picked
@@ -0,0 +1,312 @@
+import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+
+
+# A text column is reported as categorical when it has at most this many
+# distinct values, or when distinct values are under 5% of its rows
+CATEGORY_MAX_UNIQUE = 50
+CATEGORY_MAX_RATIO = 0.05
+# Share of parseable values needed to treat a column as numeric/datetime
+TYPE_MIN_RATIO = 0.95
+BOOLEAN_VALUES = {"true": True, "false": False, "yes": True, "no": False}
+
+
+class TableSummarizer:
+    """Schema-plus-statistics digest of a table.
+
+    Rather than dumping rows (of which the LLM only ever sees the first few
+    dozen), each column's type is inferred and its statistics are computed
+    over every row with NumPy: ranges and a histogram for numbers, spans for
+    dates, top values for categories. A handful of rows sampled across the
+    table shows what records look like.
+    """
+
+    def __init__(self, sample_rows: int = 5, top_categories: int = 5,
+                 histogram_bins: int = 5, max_cell_chars: int = 40):
+        self.sample_rows = sample_rows
+        self.top_categories = top_categories
+        self.histogram_bins = histogram_bins
+        self.max_cell_chars = max_cell_chars
+
+    def profile(self, rows: Iterable[Sequence]) -> Dict:
+        """Column types and statistics of a table given as an iterable of rows.
+
+        The first row is used as the header when it is all non-numeric text.
+        Blank rows (csv.reader's [] for empty lines, openpyxl's all-None
+        rows for formatted but empty cells) are skipped.
+        """
+        columns: List[List] = []
+        header = None
+        row_count = 0
+
+        for row in rows:
+            if self._is_blank(row):
+                continue
+            if header is None and row_count == 0 and self._looks_like_header(row):
+                header = [str(cell).strip() for cell in row]
+                continue
+
+            # Ragged rows: new columns start with blanks for earlier rows
+            while len(columns) < len(row):
+                columns.append([None] * row_count)
+            for column, cell in zip(columns, row):
+                column.append(cell)
+            for column in columns[len(row):]:
+                column.append(None)
+            row_count += 1
+
+        header = header or []
+        names = [
+            header[i] if i < len(header) and header[i] else f"column_{i + 1}"
+            for i in range(max(len(columns), len(header)))
+        ]
+        while len(columns) < len(names):
+            columns.append([None] * row_count)
+
+        profiles = []
+        for index, (name, values) in enumerate(zip(names, columns)):
+            profile = self._profile_column(values)
+            # Formatting artifacts: unnamed columns with nothing in them
+            if profile["type"] == "empty" and name.startswith("column_"):
+                continue
+            profile["name"] = name
+            profile["index"] = index  # Header names can repeat
+            profiles.append(profile)
+
+        return {
+            "rows": row_count,
+            "columns": profiles,
+            "sample": self._sample(columns, row_count, profiles)
+        }
+
+    def summarize(self, rows: Iterable[Sequence], title: Optional[str] = None,
+                  truncated: bool = False) -> str:
+        """Render the profile of a table as compact text for the LLM"""
+        return self.render(self.profile(rows), title, truncated)
+
+    def render(self, profile: Dict, title: Optional[str] = None,
+               truncated: bool = False) -> str:
+        columns = profile["columns"]
+        heading = f"{profile['rows']} rows × {len(columns)} columns"
+        lines = [f"--- Sheet: {title} ({heading}) ---" if title else f"--- Table ({heading}) ---"]
+        if truncated:
+            lines.append(f"(statistics cover the first {profile['rows']} rows)")
+
+        lines.append("Columns:")
+        for column in columns:
+            lines.append(f"- {column['name']} ({self._describe_type(column)}): {self._describe_stats(column)}")
+            if column.get("histogram"):
+                lines.append("  distribution: " + ", ".join(
+                    f"{self._fmt(low)}–{self._fmt(high)}: {count}"
+                    for low, high, count in column["histogram"]
+                ))
+
+        sample = profile["sample"]
+        if sample:
+            lines.append("Sample rows:")
+            lines.append(" | ".join(column["name"] for column in columns))
+            lines.extend(" | ".join(row) for row in sample)
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def _is_blank(row: Sequence) -> bool:
+        return all(cell is None or (isinstance(cell, str) and not cell.strip()) for cell in row)
+
+    def _looks_like_header(self, row: Sequence) -> bool:
+        cells = [cell for cell in row if cell is not None and str(cell).strip()]
+        if not cells:
+            return False
+        for cell in cells:
+            if not isinstance(cell, str):
+                return False
+            try:
+                float(cell)
+                return False
+            except ValueError:
+                pass
+        return True
+
+    def _profile_column(self, values: List) -> Dict:
+        """Infer the column type and compute its statistics"""
+        present = [
+            value.strip() if isinstance(value, str) else value
+            for value in values
+            if value is not None and not (isinstance(value, str) and not value.strip())
+        ]
+        profile = {"count": len(present), "missing": len(values) - len(present)}
+        if not present:
+            profile["type"] = "empty"
+            return profile
+
+        booleans = self._as_booleans(present)
+        if booleans is not None:
+            true_count = int(np.count_nonzero(booleans))
+            profile.update(type="boolean", true=true_count, false=len(present) - true_count)
+            return profile
+
+        numbers = self._as_numbers(present)
+        if numbers is not None:
+            return self._numeric_profile(profile, numbers)
+
+        dates = self._as_datetimes(present)
+        if dates is not None:
+            profile.update(type="datetime", min=str(dates.min()), max=str(dates.max()),
+                           invalid=len(present) - len(dates))
+            return profile
+
+        return self._text_profile(profile, present)
+
+    def _as_booleans(self, present: List) -> Optional[np.ndarray]:
+        if all(isinstance(value, bool) for value in present):
+            return np.array(present, dtype=bool)
+        if all(isinstance(value, str) for value in present):
+            lowered = {value.lower() for value in present}
+            if lowered <= BOOLEAN_VALUES.keys():
+                return np.array([BOOLEAN_VALUES[value.lower()] for value in present], dtype=bool)
+        return None
+
+    def _as_numbers(self, present: List) -> Optional[np.ndarray]:
+        """Float array of a numeric column (unparseable values dropped), or None"""
+        if any(isinstance(value, (bool, datetime.date, datetime.time)) for value in present):
+            return None
+        try:
+            # Whole-column conversion; handles numeric strings too
+            return np.asarray(present, dtype=np.float64)
+        except (ValueError, TypeError):
+            pass
+
+        parsed = []
+        for value in present:
+            try:
+                parsed.append(float(value))
+            except (ValueError, TypeError):
+                continue
+        if len(parsed) < TYPE_MIN_RATIO * len(present):
+            return None
+        return np.array(parsed, dtype=np.float64)
+
+    def _as_datetimes(self, present: List) -> Optional[np.ndarray]:
+        """datetime64 array of a date column (unparseable values dropped), or None"""
+        if isinstance(present[0], datetime.time):
+            return None
+
+        def parse(value):
+            # datetime64 accepts dates/datetimes and ISO 8601 strings
+            if isinstance(value, datetime.datetime):
+                value = value.replace(tzinfo=None)
+            try:
+                return np.datetime64(value, 's')
+            except (ValueError, TypeError):
+                return None
+
+        # Probe a prefix first so text columns don't pay for a full failed parse
+        probe = present[:100]
+        if sum(parse(value) is not None for value in probe) < TYPE_MIN_RATIO * len(probe):
+            return None
+
+        parsed = [parse(value) for value in present]
+        parsed = [value for value in parsed if value is not None]
+        if len(parsed) < TYPE_MIN_RATIO * len(present):
+            return None
+        return np.array(parsed, dtype='datetime64[s]')
+
+    def _numeric_profile(self, profile: Dict, numbers: np.ndarray) -> Dict:
+        invalid = profile["count"] - len(numbers)
+        numbers = numbers[np.isfinite(numbers)]
+        if not len(numbers):
+            profile.update(type="number", invalid=invalid + profile["count"])
+            return profile
+
+        is_integer = bool(np.all(numbers == np.floor(numbers)))
+        p25, median, p75 = np.percentile(numbers, [25, 50, 75])
+        profile.update(
+            type="integer" if is_integer else "number",
+            invalid=invalid,
+            min=float(numbers.min()),
+            max=float(numbers.max()),
+            mean=float(numbers.mean()),
+            std=float(numbers.std()),
+            p25=float(p25),
+            median=float(median),
+            p75=float(p75),
+            unique=int(len(np.unique(numbers)))
+        )
+
+        if profile["unique"] > self.histogram_bins:
+            counts, edges = np.histogram(numbers, bins=self.histogram_bins)
+            profile["histogram"] = [
+                (float(edges[i]), float(edges[i + 1]), int(counts[i]))
+                for i in range(len(counts))
+            ]
+        return profile
+
+    def _text_profile(self, profile: Dict, present: List) -> Dict:
+        strings = np.array([str(value) for value in present], dtype=object)
+        uniques, counts = np.unique(strings, return_counts=True)
+        order = np.argsort(-counts, kind='stable')[:self.top_categories]
+        lengths = np.fromiter((len(value) for value in strings), dtype=np.int64, count=len(strings))
+
+        categorical = (len(uniques) <= CATEGORY_MAX_UNIQUE
+                       or len(uniques) <= CATEGORY_MAX_RATIO * len(strings))
+        profile.update(
+            type="categorical" if categorical else "text",
+            unique=int(len(uniques)),
+            top=[(str(uniques[i]), int(counts[i])) for i in order],
+            avg_length=float(lengths.mean()),
+            max_length=int(lengths.max())
+        )
+        return profile
+
+    def _sample(self, columns: List[List], row_count: int, profiles: List[Dict]) -> List[List[str]]:
+        """Rows spread evenly over the table, first and last included"""
+        if not row_count or not self.sample_rows:
+            return []
+
+        kept = [profile["index"] for profile in profiles]
+        indices = np.unique(np.linspace(0, row_count - 1, min(self.sample_rows, row_count)).round().astype(int))
+        return [[self._cell(columns[c][i]) for c in kept] for i in indices]
+
+    def _cell(self, value) -> str:
+        if value is None:
+            return ""
+        text = " ".join(str(value).split())
+        if len(text) > self.max_cell_chars:
+            text = text[:self.max_cell_chars - 1] + "…"
+        return text
+
+    def _describe_type(self, column: Dict) -> str:
+        if column["type"] == "categorical":
+            return f"categorical, {column['unique']} value{'s' if column['unique'] != 1 else ''}"
+        return column["type"]
+
+    def _describe_stats(self, column: Dict) -> str:
+        kind = column["type"]
+        parts = []
+        if kind in ("integer", "number") and "min" in column:
+            parts.append(f"min {self._fmt(column['min'])}, max {self._fmt(column['max'])}, "
+                         f"mean {self._fmt(column['mean'])}, median {self._fmt(column['median'])}, "
+                         f"std {self._fmt(column['std'])}")
+            if column["unique"] <= self.histogram_bins:
+                parts.append(f"{column['unique']} distinct")
+        elif kind == "datetime":
+            parts.append(f"from {column['min']} to {column['max']}")
+        elif kind == "boolean":
+            parts.append(f"{column['true']} true, {column['false']} false")
+        elif kind == "categorical":
+            parts.append(", ".join(
+                f"{value} {100 * count / column['count']:.1f}%" for value, count in column["top"]
+            ))
+        elif kind == "text":
+            examples = ", ".join(f'"{self._cell(value)}"' for value, _ in column["top"][:3])
+            parts.append(f"{column['unique']} distinct, avg {column['avg_length']:.0f} chars; e.g. {examples}")
+
+        if column.get("invalid"):
+            parts.append(f"{column['invalid']} unparseable")
+        parts.append(f"{column['missing']} missing")
+        return "; ".join(parts)
+
+    @staticmethod
+    def _fmt(number: float) -> str:
+        return f"{number:.6g}"
@@ -0,0 +1,81 @@
+import os
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+from services.extraction_cache import ExtractionCache
+
+load_dotenv()
+
+TRANSCRIPT_CACHE_DIR = os.getenv(
+    "TRANSCRIPT_CACHE_DIR",
+    str(Path(__file__).parent.parent / "outputs" / "transcript_cache")
+)
+TRANSCRIPT_CACHE_MAX_MB = int(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "256"))
+# Captions get corrected and re-uploaded, so entries don't live forever
+TRANSCRIPT_CACHE_TTL_HOURS = float(os.getenv("TRANSCRIPT_CACHE_TTL_HOURS", "720"))
+
+
+class TranscriptCache(ExtractionCache):
+    """On-disk cache of YouTube transcripts (text, duration and segments).
+
+    Keyed on video id, language, source ("captions" or "whisper") and the
+    Whisper model size, so a transcript from a smaller model isn't served
+    once a bigger one is configured. Entries older than ttl_seconds are
+    dropped on lookup; size-based LRU eviction is ExtractionCache's.
+    """
+
+    label = "Transcript cache"
+    suffix = ".json"
+
+    def __init__(self, cache_dir: str = TRANSCRIPT_CACHE_DIR,
+                 max_bytes: int = TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024,
+                 ttl_seconds: float = TRANSCRIPT_CACHE_TTL_HOURS * 3600):
+        self.ttl_seconds = ttl_seconds
+        self.expired = 0
+        super().__init__(cache_dir, max_bytes)
+
+    @staticmethod
+    def transcript_key(video_id: str, language: str, source: str, model: Optional[str] = None) -> str:
+        return ExtractionCache.make_key(video_id, language, source, model or "-")
+
+    def get_transcript(self, video_id: str, language: str, source: str,
+                       model: Optional[str] = None, count: bool = True) -> Optional[Dict]:
+        """Cached transcript, or None if missing or expired. count=False
+        leaves the hit/miss stats alone (see ExtractionCache.get)"""
+        key = self.transcript_key(video_id, language, source, model)
+        data = self.get(key, count=False)
+        transcript = None
+        if data is not None:
+            entry = json.loads(data)
+            if time.time() - entry["created_at"] > self.ttl_seconds:
+                self.remove(key)
+                with self._lock:
+                    self.expired += 1
+            else:
+                transcript = entry["transcript"]
+
+        if count:
+            self.record_lookup(transcript is not None)
+        return transcript
+
+    def put_transcript(self, video_id: str, language: str, source: str,
+                       transcript: Dict, model: Optional[str] = None):
+        entry = {
+            "video_id": video_id,
+            "language": language,
+            "source": source,
+            "model": model,
+            "created_at": time.time(),
+            "transcript": transcript
+        }
+        # default=float: Whisper segments can carry NumPy scalars
+        self.put(self.transcript_key(video_id, language, source, model),
+                 json.dumps(entry, default=float))
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        with self._lock:
+            return {**stats, "expired": self.expired, "ttl_seconds": self.ttl_seconds}
@@ -0,0 +1,139 @@
+import os
+import time
+import uuid
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Jobs running at once (caption lookups, downloads, waiting on Whisper);
+# the rest stay queued
+TRANSCRIPTION_MAX_JOBS = int(os.getenv("TRANSCRIPTION_MAX_JOBS", "8"))
+# Finished jobs are forgotten after this long
+TRANSCRIPTION_JOB_TTL_SECONDS = int(os.getenv("TRANSCRIPTION_JOB_TTL_SECONDS", "3600"))
+
+FINISHED = ("done", "failed")
+
+
+class TranscriptionJobs:
+    """Background YouTube transcription jobs.
+
+    submit() returns a job id at once. The job looks for captions and,
+    failing that, downloads the audio and runs Whisper (on the service's
+    WhisperPool, where concurrent jobs queue for the CPU). get() returns
+    a job's status ("queued", "fetching_captions", "downloading",
+    "transcribing", "done" or "failed") with the percent done of the
+    current step; its version goes up on every change, which watch()
+    uses to follow it.
+    """
+
+    def __init__(self, youtube_service, max_jobs: int = TRANSCRIPTION_MAX_JOBS,
+                 ttl_seconds: int = TRANSCRIPTION_JOB_TTL_SECONDS):
+        self.youtube_service = youtube_service
+        self.ttl_seconds = ttl_seconds
+        self.jobs: Dict[str, Dict] = {}
+
+        self._lock = threading.Lock()
+        self._runner = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="transcription")
+
+    def submit(self, url: str) -> Dict:
+        """Queue a transcription of url; returns the new job"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        job = {"job_id": job_id, "url": url, "status": "queued", "progress": 0,
+               "source": None, "cached": False, "result": None, "error": None,
+               "created_at": now, "updated_at": now, "version": 0}
+        with self._lock:
+            self._prune()
+            self.jobs[job_id] = job
+            snapshot = dict(job)
+        self._runner.submit(self._run, job_id, url)
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    async def watch(self, job_id: str, poll_seconds: float = 0.5, heartbeat_seconds: float = 15):
+        """Yield the job each time it changes, until it finishes. Yields
+        None after heartbeat_seconds without a change, so callers can keep
+        idle connections alive."""
+        version = None
+        idle = 0.0
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                return
+            if job["version"] != version:
+                version = job["version"]
+                idle = 0.0
+                yield job
+                if job["status"] in FINISHED:
+                    return
+            elif idle >= heartbeat_seconds:
+                idle = 0.0
+                yield None
+            await asyncio.sleep(poll_seconds)
+            idle += poll_seconds
+
+    def shutdown(self):
+        self._runner.shutdown(wait=False, cancel_futures=True)
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            job.update(changes)
+            job["updated_at"] = time.time()
+            job["version"] += 1
+
+    def _prune(self):
+        """Forget jobs that finished more than ttl_seconds ago (lock held)"""
+        cutoff = time.time() - self.ttl_seconds
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job["status"] in FINISHED and job["updated_at"] < cutoff]:
+            del self.jobs[job_id]
+
+    def _run(self, job_id: str, url: str):
+        youtube = self.youtube_service
+        start = time.perf_counter()
+        try:
+            video_id = youtube.extract_video_id(url)
+            if not video_id:
+                raise Exception("Invalid YouTube URL")
+
+            video_details = youtube.get_video_details(video_id)
+            cached = youtube.cached_transcript(video_id)
+            if cached:
+                source, transcript = cached
+                result = youtube.build_video_info(url, video_id, video_details, transcript)
+                self._update(job_id, status="done", progress=100, source=source, cached=True, result=result)
+                return
+
+            self._update(job_id, status="fetching_captions")
+            transcript = youtube.try_get_captions(video_id)
+            source = "captions"
+
+            if not transcript:
+                source = "whisper"
+                self._update(job_id, status="downloading", progress=0)
+                audio_path = youtube.download_audio(
+                    video_id, progress=lambda percent: self._update(job_id, progress=round(percent, 1))
+                )
+                self._update(job_id, status="transcribing", progress=0)
+                transcript = youtube.transcribe_with_whisper(
+                    audio_path, progress=lambda percent: self._update(job_id, progress=percent)
+                )
+            youtube.cache_transcript(video_id, source, transcript)
+
+            result = youtube.build_video_info(url, video_id, video_details, transcript)
+            self._update(job_id, status="done", progress=100, source=source, result=result)
+            print(f"✅ Transcription job {job_id} done ({source}) in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            print(f"❌ Transcription job {job_id} failed: {e}")
+            self._update(job_id, status="failed", error=str(e))
@@ -1,12 +1,132 @@
 import os
 import asyncio
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List, Optional
 from dotenv import load_dotenv
 from services.oumi_client import OumiClient
 
 load_dotenv()
 
+TTS_ENCODE_WORKERS = int(os.getenv("TTS_ENCODE_WORKERS", "2"))
+
+# Output profiles for podcast audio. "mp3" keeps the provider's MP3 as-is;
+# the compact profiles fetch lossless FLAC and encode it once to mono speech
+# settings, so there is no second lossy generation.
+AUDIO_PROFILES = {
+    "mp3": {
+        "source_format": "mp3",
+        "container": "mp3",
+        "extension": "mp3",
+        "codec": "libmp3lame",
+        "bitrate_kbps": None,
+        "channels": None,
+        "sample_rate": None,
+        "parameters": [],
+        "mime_type": "audio/mpeg",
+        "passthrough": True,
+    },
+    "mp3_mono": {
+        "source_format": "flac",
+        "container": "mp3",
+        "extension": "mp3",
+        "codec": "libmp3lame",
+        "bitrate_kbps": 48,
+        "channels": 1,
+        "sample_rate": 24000,
+        "parameters": [],
+        "mime_type": "audio/mpeg",
+        "passthrough": False,
+    },
+    "opus": {
+        "source_format": "flac",
+        "container": "ogg",
+        "extension": "ogg",
+        "codec": "libopus",
+        "bitrate_kbps": 24,
+        "channels": 1,
+        "sample_rate": 24000,
+        "parameters": ["-application", "voip"],
+        "mime_type": "audio/ogg",
+        "passthrough": False,
+    },
+}
+
+
+def get_audio_profile(name: str) -> dict:
+    """Look up an audio output profile by name"""
+    profile = AUDIO_PROFILES.get((name or "mp3").lower())
+    if profile is None:
+        raise Exception(
+            f"Unsupported audio profile: {name}. "
+            f"Choose one of: {', '.join(AUDIO_PROFILES)}"
+        )
+    return profile
+
+
+def encode_audio(input_files: List[str], output_path: str, profile: dict,
+                 bitrate_kbps: Optional[int] = None) -> str:
+    """Concatenate source audio files and encode them with an output profile.
+
+    Blocking (decoding + ffmpeg), so callers on the event loop should run
+    it in an executor.
+    """
+    bitrate_kbps = bitrate_kbps or profile["bitrate_kbps"]
+    bitrate = f"{bitrate_kbps}k" if bitrate_kbps else None
+
+    try:
+        from pydub import AudioSegment
+
+        combined = AudioSegment.empty()
+        for file_path in input_files:
+            combined += AudioSegment.from_file(file_path, format=profile["source_format"])
+
+        if profile["channels"]:
+            combined = combined.set_channels(profile["channels"])
+        if profile["sample_rate"]:
+            combined = combined.set_frame_rate(profile["sample_rate"])
+
+        combined.export(
+            output_path,
+            format=profile["container"],
+            codec=profile["codec"],
+            bitrate=bitrate,
+            parameters=profile["parameters"],
+        )
+
+    except ImportError:
+        import subprocess
+        import tempfile
+
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as list_file:
+            for file_path in input_files:
+                list_file.write(f"file '{os.path.abspath(file_path)}'\n")
+
+        cmd = ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', list_file.name]
+        if profile["passthrough"] and not bitrate:
+            cmd += ['-c', 'copy']
+        else:
+            cmd += ['-c:a', profile["codec"]]
+            if bitrate:
+                cmd += ['-b:a', bitrate]
+            if profile["channels"]:
+                cmd += ['-ac', str(profile["channels"])]
+            if profile["sample_rate"]:
+                cmd += ['-ar', str(profile["sample_rate"])]
+            cmd += profile["parameters"]
+        cmd += ['-f', profile["container"], str(output_path), '-y']
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        finally:
+            os.remove(list_file.name)
+
+        if result.returncode != 0:
+            raise Exception(f"ffmpeg encode failed: {result.stderr}")
+
+    return str(output_path)
+
 
 class TTSService:
     def __init__(self):
@@ -18,21 +138,35 @@ class TTSService:
         self.output_dir = Path(__file__).parent.parent / "outputs" / "podcasts"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Encoding shells out to ffmpeg, so a small thread pool keeps it off
+        # the event loop without holding the GIL
+        self.encode_pool = ThreadPoolExecutor(
+            max_workers=TTS_ENCODE_WORKERS,
+            thread_name_prefix="tts-encode"
+        )
+        
         print(f"📁 Podcast output directory: {self.output_dir}")
 
-    async def generate_podcast_audio(self, script: str, document_id: str) -> str:
+    async def generate_podcast_audio(self, script: str, document_id: str,
+                                     audio_profile: str = "mp3",
+                                     bitrate_kbps: Optional[int] = None) -> str:
         """Generate podcast audio from script using Oumi TTS"""
         print("🎧 Generating podcast audio...")
         print(f"   Script length: {len(script)} characters")
         
+        profile = get_audio_profile(audio_profile)
+        if bitrate_kbps is not None and bitrate_kbps <= 0:
+            raise Exception(f"Invalid bitrate: {bitrate_kbps} kbps")
+        print(f"   Audio profile: {audio_profile} ({bitrate_kbps or profile['bitrate_kbps'] or 'source'} kbps)")
+        
         estimated_words = len(script) / 5
         estimated_minutes = estimated_words / 150
         print(f"   Estimated duration: {estimated_minutes:.1f} minutes")
         
-        output_path = self.output_dir / f"{document_id}.mp3"
+        output_path = self.output_dir / f"{document_id}.{profile['extension']}"
         
         try:
-            await self._generate_with_oumi(script, str(output_path), document_id)
+            await self._generate_with_oumi(script, str(output_path), document_id, profile, bitrate_kbps)
             
             print(f"✅ Podcast audio generated:  {output_path}")
             return str(output_path)
@@ -43,30 +177,48 @@ class TTSService:
             traceback.print_exc()
             raise Exception(f"Failed to generate podcast audio: {str(e)}")
 
-    async def _generate_with_oumi(self, script: str, output_path: str, document_id:  str):
+    async def _generate_with_oumi(self, script: str, output_path: str, document_id:  str,
+                                  profile: dict, bitrate_kbps: Optional[int] = None):
         """Generate audio using Oumi TTS API"""
         print("   Using Oumi TTS...")
         
         max_chunk_size = 4000
         
         if len(script) <= max_chunk_size:
-            await self._generate_single_chunk(script, output_path)
+            await self._generate_single_chunk(script, output_path, document_id, profile, bitrate_kbps)
         else:
-            await self._generate_multiple_chunks(script, output_path, document_id)
+            await self._generate_multiple_chunks(script, output_path, document_id, profile, bitrate_kbps)
 
-    async def _generate_single_chunk(self, text: str, output_path: str):
+    async def _generate_single_chunk(self, text: str, output_path: str, document_id: str,
+                                     profile: dict, bitrate_kbps: Optional[int] = None):
         """Generate audio for a single text chunk"""
         audio_bytes = await self.oumi.text_to_speech(
             text=text,
             voice="alloy",
             model="tts-1",
-            speed=1.0
+            speed=1.0,
+            response_format=profile["source_format"]
         )
         
-        with open(output_path, 'wb') as f:
+        if profile["passthrough"] and not bitrate_kbps:
+            with open(output_path, 'wb') as f:
+                f.write(audio_bytes)
+            return
+        
+        temp_path = self.output_dir / f"temp_{document_id}_0.{profile['source_format']}"
+        with open(temp_path, 'wb') as f:
             f.write(audio_bytes)
+        
+        try:
+            await self._merge_audio_files([str(temp_path)], output_path, profile, bitrate_kbps)
+        finally:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
 
-    async def _generate_multiple_chunks(self, script: str, output_path: str, document_id: str):
+    async def _generate_multiple_chunks(self, script: str, output_path: str, document_id: str,
+                                        profile: dict, bitrate_kbps: Optional[int] = None):
         """Generate audio for multiple chunks and merge"""
         print(f"   Script is long ({len(script)} chars), splitting...")
         
@@ -76,33 +228,35 @@ class TTSService:
         print(f"   Generated {len(chunks)} chunks")
         
         temp_files = []
-        for i, chunk in enumerate(chunks):
-            print(f"   Generating chunk {i+1}/{len(chunks)}...")
-            temp_path = self.output_dir / f"temp_{document_id}_{i}.mp3"
-            
-            audio_bytes = await self.oumi.text_to_speech(
-                text=chunk,
-                voice="alloy",
-                speed=1.0
-            )
-            
-            with open(temp_path, 'wb') as f:
-                f.write(audio_bytes)
+        try:
+            for i, chunk in enumerate(chunks):
+                print(f"   Generating chunk {i+1}/{len(chunks)}...")
+                temp_path = self.output_dir / f"temp_{document_id}_{i}.{profile['source_format']}"
+                
+                audio_bytes = await self.oumi.text_to_speech(
+                    text=chunk,
+                    voice="alloy",
+                    speed=1.0,
+                    response_format=profile["source_format"]
+                )
+                
+                with open(temp_path, 'wb') as f:
+                    f.write(audio_bytes)
+                
+                temp_files.append(str(temp_path))
             
-            temp_files.append(str(temp_path))
-        
-        print(f"   Merging {len(temp_files)} audio files...")
-        await self._merge_audio_files(temp_files, output_path)
-        
-        for temp_file in temp_files:
-            try:
-                os.remove(temp_file)
-            except: 
-                pass
+            print(f"   Merging {len(temp_files)} audio files...")
+            await self._merge_audio_files(temp_files, output_path, profile, bitrate_kbps)
+        finally:
+            for temp_file in temp_files:
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
 
     def _split_into_sentences(self, text:  str) -> list:
         """Split text into sentences"""
-        sentences = re.split(r'(? <=[.!?])\s+', text)
+        sentences = re.split(r'(?<=[.!?])\s+', text)
         return [s.strip() for s in sentences if s.strip()]
 
     def _group_sentences_into_chunks(self, sentences: list, max_size: int) -> list:
@@ -123,37 +277,19 @@ class TTSService:
         
         return chunks
 
-    async def _merge_audio_files(self, input_files: list, output_path: str):
-        """Merge multiple MP3 files"""
-        try:
-            from pydub import AudioSegment
-            
-            combined = AudioSegment.empty()
-            for file_path in input_files:
-                audio = AudioSegment.from_mp3(file_path)
-                combined += audio
-            
-            combined.export(output_path, format="mp3")
-            print(f"   ✅ Merged {len(input_files)} files")
-            
-        except ImportError:
-            print("   Using ffmpeg for merging...")
-            import subprocess
-            
-            list_file = self.output_dir / "merge_list.txt"
-            with open(list_file, 'w') as f:
-                for file_path in input_files: 
-                    f.write(f"file '{file_path}'\n")
-            
-            cmd = [
-                'ffmpeg', '-f', 'concat', '-safe', '0',
-                '-i', str(list_file), '-c', 'copy', str(output_path), '-y'
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                raise Exception(f"ffmpeg merge failed: {result.stderr}")
-            
-            os.remove(list_file)
-            print(f"   ✅ Merged with ffmpeg")
+    async def _merge_audio_files(self, input_files: list, output_path: str,
+                                 profile: Optional[dict] = None,
+                                 bitrate_kbps: Optional[int] = None):
+        """Merge audio files and encode them in the encode pool"""
+        profile = profile or AUDIO_PROFILES["mp3"]
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self.encode_pool,
+            encode_audio,
+            input_files,
+            output_path,
+            profile,
+            bitrate_kbps
+        )
+        print(f"   ✅ Encoded {len(input_files)} file(s) as {profile['container']}")
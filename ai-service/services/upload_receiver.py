@@ -0,0 +1,145 @@
+import os
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Dict
+from dotenv import load_dotenv
+from multipart.multipart import MultipartParser, parse_options_header
+
+load_dotenv()
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", str(Path(__file__).parent.parent / "outputs" / "uploads"))
+UPLOAD_MAX_MB = int(os.getenv("UPLOAD_MAX_MB", "200"))
+# Non-file form fields are small (ids, options); anything larger is rejected
+FORM_FIELD_MAX_BYTES = 64 * 1024
+UPLOAD_MAX_FILES = int(os.getenv("UPLOAD_MAX_FILES", "100"))
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UploadReceiver:
+    """Streams multipart/form-data uploads straight to disk.
+
+    The request body is fed to python-multipart's push parser as it
+    arrives, so only one network chunk is in memory at a time. The file
+    part is written to a temp file (keeping its extension, which file type
+    detection falls back on) and hashed on the way, so the digest is
+    ready for the extraction cache without reading the file again.
+    """
+
+    def __init__(self, upload_dir: str = UPLOAD_DIR,
+                 max_bytes: int = UPLOAD_MAX_MB * 1024 * 1024):
+        self.upload_dir = Path(upload_dir)
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    async def receive(self, request, field_name: str = "file") -> Dict:
+        """Read a single-file upload and return {"path", "filename",
+        "sha256", "size", "fields"}. The caller deletes path when done."""
+        upload = await self.receive_files(request, field_name, max_files=1)
+        return {**upload["files"][0], "fields": upload["fields"]}
+
+    async def receive_files(self, request, field_name: str = "files",
+                            max_files: int = UPLOAD_MAX_FILES) -> Dict:
+        """Read every file in field_name and return {"files": [{"path",
+        "filename", "sha256", "size"}], "fields"}. max_files and max_bytes
+        (the total size) bound the upload. The caller deletes the paths."""
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise Exception("Expected a multipart/form-data upload")
+
+        state = {"headers": {}, "header_field": b"", "header_value": b"",
+                 "name": None, "target": None, "value": b"", "file": None,
+                 "digest": None, "total": 0}
+        files = []
+        fields = {}
+
+        def on_part_begin():
+            state["headers"] = {}
+            state["target"] = None
+            state["value"] = b""
+
+        def on_header_field(data, start, end):
+            state["header_field"] += data[start:end]
+
+        def on_header_value(data, start, end):
+            state["header_value"] += data[start:end]
+
+        def on_header_end():
+            state["headers"][state["header_field"].lower()] = state["header_value"]
+            state["header_field"] = state["header_value"] = b""
+
+        def on_headers_finished():
+            _, options = parse_options_header(state["headers"].get(b"content-disposition", b""))
+            name = options.get(b"name", b"").decode('utf-8', 'replace')
+            filename = options.get(b"filename")
+            state["name"] = name
+
+            if filename is not None and name == field_name:
+                if len(files) >= max_files:
+                    raise UploadTooLarge(f"Too many files (limit {max_files})")
+                filename = os.path.basename(filename.decode('utf-8', 'replace'))
+                suffix = os.path.splitext(filename)[1].lower()
+                state["file"] = tempfile.NamedTemporaryFile(dir=self.upload_dir, suffix=suffix, delete=False)
+                state["digest"] = hashlib.sha256()
+                files.append({"path": state["file"].name, "filename": filename, "sha256": None, "size": 0})
+                state["target"] = "file"
+            elif filename is None:
+                state["target"] = "field"
+
+        def on_part_data(data, start, end):
+            if state["target"] == "file":
+                block = data[start:end]
+                files[-1]["size"] += len(block)
+                state["total"] += len(block)
+                if state["total"] > self.max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {self.max_bytes // (1024 * 1024)} MB")
+                state["digest"].update(block)
+                state["file"].write(block)
+            elif state["target"] == "field":
+                state["value"] += data[start:end]
+                if len(state["value"]) > FORM_FIELD_MAX_BYTES:
+                    raise Exception(f"Form field {state['name']} is too large")
+
+        def on_part_end():
+            if state["target"] == "file":
+                state["file"].close()
+                state["file"] = None
+                files[-1]["sha256"] = state["digest"].hexdigest()
+            elif state["target"] == "field":
+                fields[state["name"]] = state["value"].decode('utf-8', 'replace')
+
+        parser = MultipartParser(boundary, {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        })
+
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+            parser.finalize()
+        except BaseException:
+            if state["file"]:
+                state["file"].close()
+            self.discard(files)
+            raise
+
+        if not files:
+            raise Exception(f"No file in form field '{field_name}'")
+        return {"files": files, "fields": fields}
+
+    def discard(self, files):
+        """Delete received files"""
+        for file in files:
+            try:
+                os.remove(file["path"])
+            except FileNotFoundError:
+                pass
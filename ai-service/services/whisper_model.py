@@ -0,0 +1,84 @@
+import os
+import time
+import threading
+from typing import Dict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# tiny, base, small, medium, large: bigger is slower, more accurate and uses more RAM
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+# Load the model while the app is imported instead of on first transcription.
+# Under a forking multi-worker server (gunicorn --preload -k
+# uvicorn.workers.UvicornWorker) the workers then share the parent's copy of
+# the weights copy-on-write. uvicorn --workers starts fresh processes, so
+# there each worker loads its own.
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "false").lower() == "true"
+# Transcribe a second of silence at startup so the first real job doesn't
+# pay for loading and the first decode
+WHISPER_WARMUP = os.getenv("WHISPER_WARMUP", "false").lower() == "true"
+
+SAMPLE_RATE = 16000  # Whisper resamples everything to 16 kHz mono
+
+
+class WhisperModel:
+    """The Whisper model, loaded on first use and shared by every caller
+    in the process (whisper itself is imported then too, since it pulls
+    in torch)."""
+
+    def __init__(self, name: str = WHISPER_MODEL):
+        self.name = name
+        self.load_seconds = None
+        self.warmed_up = False
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self):
+        """The loaded model; the first caller loads it, concurrent callers wait"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import whisper
+
+                    print(f"🎤 Loading Whisper model '{self.name}'...")
+                    start = time.perf_counter()
+                    model = whisper.load_model(self.name)
+                    self.load_seconds = round(time.perf_counter() - start, 2)
+                    self._model = model
+                    print(f"✅ Whisper model loaded in {self.load_seconds}s")
+        return self._model
+
+    def warm_up(self):
+        """Load the model and run it once on silence"""
+        model = self.get()
+        if self.warmed_up:
+            return
+        import numpy as np
+
+        start = time.perf_counter()
+        model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), language="en")
+        self.warmed_up = True
+        print(f"🔥 Whisper warmed up in {time.perf_counter() - start:.1f}s")
+
+    def __getstate__(self):
+        # Sent to a spawned process, the holder loads its own model there
+        return {"name": self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state["name"])
+
+    def status(self) -> Dict:
+        return {
+            "model": self.name,
+            "loaded": self.loaded,
+            "load_seconds": self.load_seconds,
+            "warmed_up": self.warmed_up
+        }
+
+
+# Shared by every YouTubeService in this process
+whisper_model = WhisperModel()
@@ -0,0 +1,309 @@
+import os
+import re
+import sys
+import uuid
+import types
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from services.whisper_model import whisper_model as shared_whisper_model, WhisperModel, SAMPLE_RATE
+
+load_dotenv()
+
+# Whisper worker processes. The cores are split between them (each runs
+# torch on cores / workers threads). Every worker holds its own copy of
+# the model unless it was preloaded before the pool forked, so raise this
+# only with the memory for it.
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", "1"))
+# Opt-in: split long audio at silences and transcribe the pieces on all
+# workers at once. Off, each transcription runs on one worker and extra
+# workers serve concurrent jobs.
+WHISPER_SEGMENTING = os.getenv("WHISPER_SEGMENTING", "false").lower() == "true"
+# When segmenting, long audio is split into about one segment per worker,
+# each between these lengths; shorter audio is transcribed in one piece
+WHISPER_MIN_SEGMENT_SECONDS = float(os.getenv("WHISPER_MIN_SEGMENT_SECONDS", "120"))
+WHISPER_MAX_SEGMENT_SECONDS = float(os.getenv("WHISPER_MAX_SEGMENT_SECONDS", "900"))
+# Cuts are moved to the nearest silence within this many seconds
+WHISPER_SILENCE_SEARCH_SECONDS = float(os.getenv("WHISPER_SILENCE_SEARCH_SECONDS", "30"))
+
+SILENCE_NOISE_DB = -30
+SILENCE_MIN_SECONDS = 0.3
+FRAMES_PER_SECOND = 100  # Whisper's mel frames ("seek" is counted in these)
+
+# Set in each Whisper worker by _init_worker
+_progress_queue = None
+_whisper_model = None
+
+
+def _available_cpus() -> int:
+    """Cores this process may run on (os.cpu_count() is the host's, even
+    in a CPU-limited container)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker(progress_queue, torch_threads: int, whisper_model: WhisperModel):
+    global _progress_queue, _whisper_model
+    _progress_queue = progress_queue
+    # Forked workers inherit the parent's holder, so a preloaded model is shared
+    _whisper_model = whisper_model
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+
+def _progress_bar(token: str, index: int):
+    """tqdm class that reports Whisper's progress to the parent process"""
+    import tqdm
+
+    class ProgressBar(tqdm.tqdm):
+        def update(self, n=1):
+            super().update(n)
+            self.frames = getattr(self, "frames", 0) + n
+            percent = min(100, int(100 * self.frames / self.total)) if self.total else 0
+            if percent != getattr(self, "reported", None):
+                self.reported = percent
+                _progress_queue.put((token, index, percent))
+
+    return ProgressBar
+
+
+def load_audio_slice(audio_path: str, start: float, duration: float):
+    """start..start+duration of an audio file as 16 kHz mono float32, the
+    way whisper.load_audio decodes whole files"""
+    import numpy as np
+
+    command = ["ffmpeg", "-nostdin", "-threads", "0", "-ss", f"{start:.3f}", "-t", f"{duration:.3f}",
+               "-i", audio_path, "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+               "-ar", str(SAMPLE_RATE), "-"]
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode != 0:
+        raise Exception(f"Failed to decode audio: {result.stderr.decode('utf-8', 'replace')[-300:]}")
+    return np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+def _transcribe_worker(token: str, index: int, audio_path: str, start: Optional[float],
+                       duration: Optional[float], language: str) -> Dict:
+    """Whisper worker process: transcribe audio_path (or the slice from
+    start, for duration seconds), reporting progress"""
+    model = _whisper_model.get()
+    audio = audio_path if start is None else load_audio_slice(audio_path, start, duration)
+
+    # whisper.transcribe advances a tqdm.tqdm(total=frames) bar as it
+    # decodes (even when it isn't displayed); swap in one that reports
+    module = sys.modules.get("whisper.transcribe")
+    original = getattr(module, "tqdm", None)
+    if original is not None and _progress_queue is not None:
+        module.tqdm = types.SimpleNamespace(tqdm=_progress_bar(token, index))
+    try:
+        result = model.transcribe(audio, language=language)
+    finally:
+        if original is not None:
+            module.tqdm = original
+    return {"text": result["text"], "segments": result.get("segments", [])}
+
+
+def _warm_up_worker():
+    _whisper_model.warm_up()
+    return os.getpid()
+
+
+def scan_audio(audio_path: str) -> Tuple[float, List[Tuple[float, float]]]:
+    """(duration, [(silence_start, silence_end)]) using ffmpeg's
+    silencedetect, without decoding the audio into Python"""
+    command = ["ffmpeg", "-nostdin", "-i", audio_path,
+               "-af", f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_SECONDS}",
+               "-f", "null", "-"]
+    result = subprocess.run(command, capture_output=True)
+    log = result.stderr.decode('utf-8', 'replace')
+    if result.returncode != 0:
+        raise Exception(f"Failed to scan audio: {log[-300:]}")
+
+    # The last progress time is the decoded length; the header's Duration
+    # is only an estimate for some formats
+    times = re.findall(r"time=(\d+):(\d+):([\d.]+)", log) or re.findall(r"Duration: (\d+):(\d+):([\d.]+)", log)
+    duration = 0.0
+    if times:
+        hours, minutes, seconds = times[-1]
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    starts = [float(value) for value in re.findall(r"silence_start: (-?[\d.]+)", log)]
+    ends = [float(value) for value in re.findall(r"silence_end: ([\d.]+)", log)]
+    if len(starts) > len(ends):
+        ends.append(duration)  # Silent until the end
+    return duration, list(zip(starts, ends))
+
+
+def plan_segments(duration: float, silences: List[Tuple[float, float]], segment_seconds: float,
+                  search_seconds: float = WHISPER_SILENCE_SEARCH_SECONDS) -> List[Tuple[float, float]]:
+    """Split 0..duration into (start, end) pieces about segment_seconds
+    long, cutting in the middle of the silence nearest each target point"""
+    middles = [(start + end) / 2 for start, end in silences]
+    segments = []
+    start = 0.0
+    # The last piece may run up to 1.5x long rather than leave a short tail
+    while duration - start > segment_seconds * 1.5:
+        target = start + segment_seconds
+        nearby = [middle for middle in middles if abs(middle - target) <= search_seconds and middle > start]
+        cut = min(nearby, key=lambda middle: abs(middle - target)) if nearby else target
+        segments.append((start, cut))
+        start = cut
+    segments.append((start, duration))
+    return segments
+
+
+def stitch_results(results: List[Dict], offsets: List[float]) -> Dict:
+    """Merge per-segment Whisper results into one, shifting timestamps by
+    each segment's offset into the audio"""
+    text = []
+    segments = []
+    for result, offset in zip(results, offsets):
+        text.append(result["text"].strip())
+        for segment in result["segments"]:
+            segment = {**segment, "id": len(segments),
+                       "start": segment["start"] + offset, "end": segment["end"] + offset}
+            if "seek" in segment:
+                segment["seek"] += round(offset * FRAMES_PER_SECOND)
+            if segment.get("words"):
+                segment["words"] = [{**word, "start": word["start"] + offset, "end": word["end"] + offset}
+                                    for word in segment["words"]]
+            segments.append(segment)
+    return {"text": " ".join(part for part in text if part), "segments": segments}
+
+
+class WhisperPool:
+    """Runs Whisper on a bounded pool of worker processes.
+
+    Concurrent transcriptions queue for the workers instead of
+    oversubscribing the CPU. With segmenting on and more than one worker,
+    audio longer than two minimum-length segments is split at silences
+    into about one segment per worker (see plan_segments); the segments
+    are transcribed in parallel, each worker decoding its own slice, and
+    stitched back with their timestamps shifted into place.
+    """
+
+    def __init__(self, workers: int = WHISPER_WORKERS,
+                 min_segment_seconds: float = WHISPER_MIN_SEGMENT_SECONDS,
+                 max_segment_seconds: float = WHISPER_MAX_SEGMENT_SECONDS,
+                 whisper_model: WhisperModel = None, segmenting: bool = WHISPER_SEGMENTING):
+        self.workers = workers
+        self.segmenting = segmenting
+        self.min_segment_seconds = min_segment_seconds
+        self.max_segment_seconds = max_segment_seconds
+        self.whisper_model = whisper_model or shared_whisper_model
+        self.warmed_up = False
+
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._progress_queue = None
+        self._progress: Dict[str, list] = {}  # token -> [weights, percents, callback, last]
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Worker pool, started on first use (after any preload, so forked
+        workers inherit a preloaded model)"""
+        with self._lock:
+            if self._pool is None:
+                if self._progress_queue is None:
+                    self._progress_queue = multiprocessing.get_context().Queue()
+                    threading.Thread(target=self._listen, name="whisper-progress", daemon=True).start()
+                torch_threads = max(1, _available_cpus() // self.workers)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker,
+                    initargs=(self._progress_queue, torch_threads, self.whisper_model)
+                )
+                print(f"🎤 Whisper pool: {self.workers} workers x {torch_threads} threads")
+            return self._pool
+
+    def plan(self, audio_path: str) -> List[Tuple[float, float]]:
+        """Segments to transcribe, or [] to transcribe the file whole"""
+        if not self.segmenting or self.workers < 2:
+            return []
+        duration, silences = scan_audio(audio_path)
+        if duration < self.min_segment_seconds * 2:
+            return []
+        segment_seconds = min(self.max_segment_seconds,
+                              max(self.min_segment_seconds, duration / self.workers))
+        return plan_segments(duration, silences, segment_seconds)
+
+    def transcribe(self, audio_path: str, language: str = "en", progress=None) -> Dict:
+        """Whisper result ({"text", "segments"}) for an audio file. progress,
+        if given, is called from a background thread with the percent done."""
+        segments = self.plan(audio_path)
+        jobs = [(start, end - start) for start, end in segments] or [(None, None)]
+        if len(jobs) > 1:
+            print(f"✂️ Split {segments[-1][1]:.0f}s of audio into {len(jobs)} segments")
+
+        token = uuid.uuid4().hex
+        with self._lock:
+            weights = [duration or 1 for _, duration in jobs]
+            self._progress[token] = [weights, [0] * len(jobs), progress, -1]
+        try:
+            pool = self.pool
+            futures = [pool.submit(_transcribe_worker, token, index, audio_path, start, duration, language)
+                       for index, (start, duration) in enumerate(jobs)]
+            try:
+                results = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            with self._lock:
+                self._pool = None
+            raise Exception("Whisper worker crashed")
+        finally:
+            with self._lock:
+                self._progress.pop(token, None)
+
+        return stitch_results(results, [start or 0.0 for start, _ in jobs])
+
+    def warm_up(self):
+        """Load and warm up the model in the workers (one warm-up task per
+        worker; the pool hands them to idle workers)"""
+        futures = [self.pool.submit(_warm_up_worker) for _ in range(self.workers)]
+        wait(futures)
+        for future in futures:
+            future.result()
+        self.warmed_up = True
+
+    def status(self) -> Dict:
+        return {**self.whisper_model.status(), "workers": self.workers, "segmenting": self.segmenting,
+                "warmed_up": self.warmed_up}
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            if self._progress_queue is not None:
+                self._progress_queue.put(None)
+
+    def _listen(self):
+        """Progress thread: combine per-segment percentages reported by
+        the workers, weighted by segment length"""
+        while True:
+            message = self._progress_queue.get()
+            if message is None:
+                return
+            token, index, percent = message
+            with self._lock:
+                entry = self._progress.get(token)
+                if entry is None:
+                    continue
+                weights, percents, callback, last = entry
+                percents[index] = percent
+                total = int(sum(w * p for w, p in zip(weights, percents)) / sum(weights))
+                if total == last or callback is None:
+                    continue
+                entry[3] = total
+            callback(total)
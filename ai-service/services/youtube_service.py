@@ -1,26 +1,62 @@
 import os
 import re
+import shutil
+import asyncio
+import threading
+import httpx
 import requests
 import yt_dlp
-import whisper
 import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
+from services.whisper_model import WhisperModel, whisper_model as shared_whisper_model
+from services.transcript_cache import TranscriptCache
+
 load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+TRANSCRIPT_LANGUAGE = os.getenv("TRANSCRIPT_LANGUAGE", "en")
+# Start downloading audio for Whisper if the captions lookup hasn't answered
+# within this many seconds; the download is abandoned if captions turn up
+CAPTIONS_SPECULATION_SECONDS = float(os.getenv("CAPTIONS_SPECULATION_SECONDS", "2"))
+# Shared connection pool for YouTube API calls
+YOUTUBE_HTTP_MAX_CONNECTIONS = int(os.getenv("YOUTUBE_HTTP_MAX_CONNECTIONS", "20"))
+
+
+def whisper_transcript(result: dict) -> dict:
+    """Transcript dict (text, duration, segments) from a Whisper result"""
+    text = result["text"].strip()
+    segments = result.get("segments", [])
+    
+    # Get duration from segments
+    duration = 0
+    if segments:
+        last_segment = segments[-1]
+        duration = last_segment.get("end", 0)
+    
+    return {
+        "text":  text,
+        "duration": duration,
+        "segments": segments
+    }
 
 
 class YouTubeService: 
-    def __init__(self):
+    def __init__(self, whisper_model: WhisperModel = None, transcript_cache: TranscriptCache = None,
+                 executors=None, whisper_pool=None):
         print("✅ YouTubeService initialized")
         if YOUTUBE_API_KEY:
             print("🔐 YouTube API Key found")
         
-        # Load Whisper model (base is good balance of speed/accuracy)
-        print("🎤 Loading Whisper model...")
-        self.whisper_model = whisper.load_model("base")
-        print("✅ Whisper model loaded")
+        # Loaded on the first Whisper transcription, not here: most videos
+        # have captions, and workers that never transcribe skip the cost
+        self.whisper_model = whisper_model or shared_whisper_model
+        # Worker processes (and segmenting) for Whisper; without one it
+        # runs in this process
+        self.whisper_pool = whisper_pool
+        self.transcript_cache = transcript_cache
+        self.executors = executors
+        self._http = None
 
     def extract_video_id(self, url: str) -> str:
         """Extract video ID from YouTube URL"""
@@ -39,8 +75,9 @@ class YouTubeService:
         
         return None
 
-    def download_audio(self, video_id: str) -> str:
-        """Download audio from YouTube video"""
+    def download_audio(self, video_id: str, progress=None, cancel: threading.Event = None) -> str:
+        """Download audio from YouTube video. progress, if given, is called
+        with the percentage downloaded; setting cancel aborts the download."""
         print("📥 Downloading audio from YouTube...")
         
         url = f"https://www.youtube.com/watch?v={video_id}"
@@ -60,6 +97,14 @@ class YouTubeService:
             'quiet': True,
             'no_warnings': True,
         }
+        if progress or cancel:
+            def on_progress(status):
+                if cancel and cancel.is_set():
+                    raise Exception("Download cancelled")
+                total = status.get('total_bytes') or status.get('total_bytes_estimate')
+                if progress and status.get('status') == 'downloading' and total:
+                    progress(min(100.0, 100 * status.get('downloaded_bytes', 0) / total))
+            ydl_opts['progress_hooks'] = [on_progress]
         
         try: 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
@@ -69,49 +114,44 @@ class YouTubeService:
             return output_path
             
         except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
             raise Exception(f"Failed to download audio: {str(e)}")
 
-    def transcribe_with_whisper(self, audio_path: str) -> dict:
-        """Transcribe audio using Whisper"""
+    def transcribe_with_whisper(self, audio_path: str, progress=None) -> dict:
+        """Transcribe audio using Whisper. progress, if given, is called with
+        the percent done (only when running on the Whisper pool)."""
         print("🎤 Transcribing with Whisper AI...")
         print("   This may take 1-3 minutes depending on video length...")
         
         try:
             # Transcribe
-            result = self.whisper_model.transcribe(audio_path, language="en")
-            
-            text = result["text"].strip()
-            segments = result.get("segments", [])
-            
-            # Get duration from segments
-            duration = 0
-            if segments:
-                last_segment = segments[-1]
-                duration = last_segment.get("end", 0)
+            if self.whisper_pool:
+                result = self.whisper_pool.transcribe(audio_path, TRANSCRIPT_LANGUAGE, progress)
+            else:
+                result = self.whisper_model.get().transcribe(audio_path, language=TRANSCRIPT_LANGUAGE)
+            transcript = whisper_transcript(result)
             
-            print(f"✅ Transcription complete:  {len(text)} characters")
+            print(f"✅ Transcription complete:  {len(transcript['text'])} characters")
             
-            return {
-                "text":  text,
-                "duration": duration,
-                "segments": segments
-            }
+            return transcript
             
         except Exception as e:
             raise Exception(f"Whisper transcription failed: {str(e)}")
         
         finally:
-            # Clean up audio file
-            try:
-                if os.path.exists(audio_path):
-                    os.remove(audio_path)
-                    # Remove temp directory
-                    temp_dir = os.path.dirname(audio_path)
-                    if os.path.exists(temp_dir):
-                        import shutil
-                        shutil.rmtree(temp_dir)
-            except:
-                pass
+            self.remove_audio(audio_path)
+
+    def remove_audio(self, audio_path: str):
+        """Delete a downloaded audio file and its temp directory"""
+        try:
+            if os.path.exists(audio_path):
+                os.remove(audio_path)
+                # Remove temp directory
+                temp_dir = os.path.dirname(audio_path)
+                if os.path.exists(temp_dir):
+                    shutil.rmtree(temp_dir)
+        except:
+            pass
 
     def try_get_captions(self, video_id:  str) -> dict | None:
         """Try to get captions (fast method)"""
@@ -121,7 +161,7 @@ class YouTubeService:
             from youtube_transcript_api import YouTubeTranscriptApi
             
             # Try direct fetch
-            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['en'])
+            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=[TRANSCRIPT_LANGUAGE])
             
             if transcript:
                 full_text = ' '.join([item['text'] for item in transcript])
@@ -142,10 +182,15 @@ class YouTubeService:
     def get_transcript(self, video_id: str) -> dict:
         """Get transcript - try captions first, fallback to Whisper"""
         
+        cached = self.cached_transcript(video_id)
+        if cached:
+            return cached[1]
+        
         # METHOD 1: Try captions first (fast)
         captions = self.try_get_captions(video_id)
         if captions:
             print("✅ Using captions")
+            self.cache_transcript(video_id, "captions", captions)
             return captions
         
         # METHOD 2: Use Whisper (slower but always works)
@@ -157,51 +202,119 @@ class YouTubeService:
             
             # Transcribe with Whisper
             transcript = self.transcribe_with_whisper(audio_path)
+            self.cache_transcript(video_id, "whisper", transcript)
             
             return transcript
             
         except Exception as e:
             raise Exception(f"Failed to get transcript: {str(e)}")
 
+    def cached_transcript(self, video_id: str) -> tuple | None:
+        """(source, transcript) from the transcript cache, preferring
+        captions over Whisper output from the configured model. Counts as
+        one hit or miss however many keys are looked at."""
+        if not self.transcript_cache:
+            return None
+        
+        for source, model in (("captions", None), ("whisper", self.whisper_model.name)):
+            transcript = self.transcript_cache.get_transcript(video_id, TRANSCRIPT_LANGUAGE, source, model,
+                                                              count=False)
+            if transcript:
+                self.transcript_cache.record_lookup(True)
+                print(f"⚡ Cached transcript ({source}): {len(transcript['text'])} characters")
+                return source, transcript
+        
+        self.transcript_cache.record_lookup(False)
+        return None
+
+    def cache_transcript(self, video_id: str, source: str, transcript: dict):
+        """Store a transcript from source ("captions" or "whisper")"""
+        if not self.transcript_cache:
+            return
+        model = self.whisper_model.name if source == "whisper" else None
+        try:
+            self.transcript_cache.put_transcript(video_id, TRANSCRIPT_LANGUAGE, source, transcript, model)
+        except Exception as e:
+            print(f"⚠ Failed to cache transcript: {str(e)}")
+
     def get_video_details(self, video_id: str) -> dict:
         """Fetch video metadata"""
         print("🔍 Fetching video details...")
         
         if not YOUTUBE_API_KEY: 
-            return {"title": f"YouTube Video {video_id}", "channel": "Unknown", "duration": 0}
+            return self.default_video_details(video_id)
         
-        api_url = (
-            f"https://www.googleapis.com/youtube/v3/videos"
-            f"?id={video_id}&part=snippet,contentDetails&key={YOUTUBE_API_KEY}"
-        )
+        try:
+            response = requests.get(self.video_details_url(video_id), timeout=10)
+            return self.parse_video_details(video_id, response.json())
+        except Exception as e: 
+            print(f"⚠ Failed to get details: {str(e)}")
+        
+        return self.default_video_details(video_id)
+
+    async def get_video_details_async(self, video_id: str) -> dict:
+        """Fetch video metadata over the shared async connection pool"""
+        print("🔍 Fetching video details...")
+        
+        if not YOUTUBE_API_KEY: 
+            return self.default_video_details(video_id)
         
         try:
-            response = requests.get(api_url, timeout=10)
-            data = response.json()
-            
-            if data.get("items"):
-                item = data["items"][0]
-                snippet = item.get("snippet", {})
-                content_details = item.get("contentDetails", {})
-                
-                # Parse duration
-                duration_str = content_details.get("duration", "PT0S")
-                duration = self.parse_duration(duration_str)
-                
-                return {
-                    "title": snippet.get("title", "Unknown"),
-                    "channel": snippet.get("channelTitle", "Unknown"),
-                    "published_at": snippet.get("publishedAt"),
-                    "duration": duration
-                }
+            response = await self.http.get(self.video_details_url(video_id))
+            return self.parse_video_details(video_id, response.json())
         except Exception as e: 
             print(f"⚠ Failed to get details: {str(e)}")
         
+        return self.default_video_details(video_id)
+
+    def video_details_url(self, video_id: str) -> str:
+        return (
+            f"https://www.googleapis.com/youtube/v3/videos"
+            f"?id={video_id}&part=snippet,contentDetails&key={YOUTUBE_API_KEY}"
+        )
+
+    def default_video_details(self, video_id: str) -> dict:
         return {"title": f"YouTube Video {video_id}", "channel":  "Unknown", "duration": 0}
 
+    def parse_video_details(self, video_id: str, data: dict) -> dict:
+        """Video details from a YouTube Data API videos response"""
+        if not data.get("items"):
+            return self.default_video_details(video_id)
+        
+        item = data["items"][0]
+        snippet = item.get("snippet", {})
+        content_details = item.get("contentDetails", {})
+        
+        # Parse duration
+        duration_str = content_details.get("duration", "PT0S")
+        duration = self.parse_duration(duration_str)
+        
+        return {
+            "title": snippet.get("title", "Unknown"),
+            "channel": snippet.get("channelTitle", "Unknown"),
+            "published_at": snippet.get("publishedAt"),
+            "duration": duration
+        }
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Async HTTP client shared by all requests, so connections are reused"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=YOUTUBE_HTTP_MAX_CONNECTIONS,
+                                    max_keepalive_connections=YOUTUBE_HTTP_MAX_CONNECTIONS)
+            )
+        return self._http
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
     def parse_duration(self, duration_str:  str) -> int:
         """Parse ISO 8601 duration to seconds"""
-        pattern = r'PT(? :(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?'
+        pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?'
         match = re.match(pattern, duration_str)
         
         if not match:
@@ -227,12 +340,97 @@ class YouTubeService:
         # Get transcript (captions or Whisper)
         transcript_data = self.get_transcript(video_id)
         
+        print("🎉 Success!")
+        
+        return self.build_video_info(url, video_id, video_details, transcript_data)
+
+    async def get_video_info_async(self, url: str) -> dict:
+        """get_video_info with the details and the transcript fetched
+        concurrently; blocking steps run on the I/O pool"""
+        print("🚀 Processing YouTube video...")
+        
+        video_id = self.extract_video_id(url)
+        if not video_id: 
+            raise Exception("Invalid YouTube URL")
+        
+        details_task = asyncio.create_task(self.get_video_details_async(video_id))
+        try:
+            transcript_data = await self.get_transcript_async(video_id)
+        except BaseException:
+            details_task.cancel()
+            raise
+        video_details = await details_task
+        
+        print("🎉 Success!")
+        
+        return self.build_video_info(url, video_id, video_details, transcript_data)
+
+    async def get_transcript_async(self, video_id: str) -> dict:
+        """get_transcript, but if captions take longer than
+        CAPTIONS_SPECULATION_SECONDS the audio download for the Whisper
+        fallback starts alongside, and is cancelled if captions arrive"""
+        cached = await self._run_io(self.cached_transcript, video_id)
+        if cached:
+            return cached[1]
+        
+        captions_task = asyncio.ensure_future(self._run_io(self.try_get_captions, video_id))
+        download_task = None
+        cancel = threading.Event()
+        
+        def start_download():
+            return asyncio.ensure_future(self._run_io(self.download_audio, video_id, None, cancel))
+        
+        try:
+            await asyncio.wait({captions_task}, timeout=CAPTIONS_SPECULATION_SECONDS)
+            if not captions_task.done():
+                print(f"⏱ No captions after {CAPTIONS_SPECULATION_SECONDS:g}s - downloading audio in parallel")
+                download_task = start_download()
+            
+            captions = await captions_task
+            if captions:
+                print("✅ Using captions")
+                if download_task:
+                    self._discard_download(download_task, cancel)
+                    download_task = None
+                await self._run_io(self.cache_transcript, video_id, "captions", captions)
+                return captions
+            
+            # METHOD 2: Whisper on the (possibly already downloaded) audio
+            print("📹 No captions available - using Whisper AI transcription")
+            audio_path = await (download_task or start_download())
+            download_task = None
+            transcript = await self._run_io(self.transcribe_with_whisper, audio_path)
+            await self._run_io(self.cache_transcript, video_id, "whisper", transcript)
+            return transcript
+        
+        except Exception as e:
+            raise Exception(f"Failed to get transcript: {str(e)}")
+        
+        finally:
+            if download_task:
+                self._discard_download(download_task, cancel)
+
+    def _discard_download(self, download_task, cancel: threading.Event):
+        """Abort a speculative download and delete whatever it fetched"""
+        cancel.set()
+        
+        def cleanup(task):
+            if not task.cancelled() and task.exception() is None:
+                self.remove_audio(task.result())
+        
+        download_task.add_done_callback(cleanup)
+
+    async def _run_io(self, func, *args):
+        if self.executors:
+            return await self.executors.run_io(func, *args)
+        return await asyncio.to_thread(func, *args)
+
+    def build_video_info(self, url: str, video_id: str, video_details: dict, transcript_data: dict) -> dict:
+        """Response dict combining video details and transcript"""
         # Update duration
         if transcript_data["duration"] == 0:
             transcript_data["duration"] = video_details.get("duration", 0)
         
-        print("🎉 Success!")
-        
         return {
             "success": True,
             "video_id": video_id,
@@ -405,8 +405,10 @@ router.post('/:id/generate-podcast', async (req, res) => {
 
     // Copy audio to backend uploads
     const sourcePath = response.data.audio_path;
+    // Non-mp3 audio profiles (e.g. opus -> .ogg) keep their own extension
+    const extension = path.extname(sourcePath) || '.mp3';
     const destDir = path.join(__dirname, '../../uploads/podcasts');
-    const destPath = path.join(destDir, `${id}.mp3`);
+    const destPath = path.join(destDir, `${id}${extension}`);
 
     if (! fs.existsSync(destDir)) {
       fs.mkdirSync(destDir, { recursive: true });
@@ -414,7 +416,7 @@ router.post('/:id/generate-podcast', async (req, res) => {
 
     fs.copyFileSync(sourcePath, destPath);
 
-    const podcastUrl = `${process.env.BACKEND_URL}/uploads/podcasts/${id}.mp3`;
+    const podcastUrl = `${process.env.BACKEND_URL}/uploads/podcasts/${id}${extension}`;
 
     // Update document
     const { error: updateError } = await supabase
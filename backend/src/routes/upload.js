@@ -339,9 +339,11 @@ async function generateAllContent(documentId, textContent, filename) {
       );
 
       const sourcePath = podcastResponse.data.audio_path;
+      // Non-mp3 audio profiles (e.g. opus -> .ogg) keep their own extension
+      const extension = path.extname(sourcePath) || '.mp3';
       const podcastScript = podcastResponse.data.script;
       const destDir = path.join(__dirname, '../../uploads/podcasts');
-      const destPath = path.join(destDir, `${documentId}.mp3`);
+      const destPath = path.join(destDir, `${documentId}${extension}`);
 
       if (!fs.existsSync(destDir)) {
         fs.mkdirSync(destDir, { recursive:  true });
@@ -349,7 +351,7 @@ async function generateAllContent(documentId, textContent, filename) {
 
       fs.copyFileSync(sourcePath, destPath);
 
-      const podcastUrl = `${process.env.BACKEND_URL}/uploads/podcasts/${documentId}.mp3`;
+      const podcastUrl = `${process.env.BACKEND_URL}/uploads/podcasts/${documentId}${extension}`;
 
       await supabase
         .from('documents')
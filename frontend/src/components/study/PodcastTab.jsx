@@ -124,7 +124,8 @@ const PodcastTab = ({ document, onUpdate }) => {
     if (!document.podcast_url) return;
     const a = window.document.createElement('a');
     a.href = document.podcast_url;
-    a.download = `${document.filename.replace('.pdf', '')}_podcast.mp3`;
+    const extension = document.podcast_url.match(/\.(\w+)$/)?.[1] || 'mp3';
+    a.download = `${document.filename.replace('.pdf', '')}_podcast.${extension}`;
     a.click();
     toast.success('Downloading podcast...');
   };